@@ -1,15 +1,28 @@
 #!/usr/bin/env python3
 """Analyze decision logs to understand trading pipeline behaviour."""
 
-import json
 import datetime
 from pathlib import Path
-from collections import defaultdict, Counter
+from collections import Counter, defaultdict
 import argparse
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from quant_trading.analytics.decision_logs import latest_decision_file, read_decision_file
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 LOGS_DIR = PROJECT_ROOT / "trading_logs"
 
+CONFIDENCE_EDGES = np.array([0.0, 0.1, 0.2, 0.3, 0.5, 0.8, 1.0])
+
+
+def _count_in_ranges(values: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """统计落在各个 [edges[k], edges[k+1]) 区间内的数量"""
+    bins = np.searchsorted(edges, values, side='right') - 1
+    in_range = (bins >= 0) & (bins < len(edges) - 1)
+    return np.bincount(bins[in_range], minlength=len(edges) - 1)
+
 
 def load_decision_data(date_str=None):
     """加载交易决策数据"""
@@ -18,11 +31,10 @@ def load_decision_data(date_str=None):
     if date_str:
         decision_file = logs_dir / f"trading_decisions_{date_str}.json"
     else:
-        decision_files = list(logs_dir.glob("trading_decisions_*.json"))
-        if not decision_files:
+        decision_file = latest_decision_file(logs_dir)
+        if decision_file is None:
             print("未找到交易决策文件")
             return None
-        decision_file = max(decision_files, key=lambda f: f.stat().st_mtime)
         print(f"分析文件: {decision_file}")
 
     if not decision_file.exists():
@@ -30,24 +42,45 @@ def load_decision_data(date_str=None):
         return None
 
     try:
-        with open(decision_file, "r", encoding="utf-8") as f:
-            return json.load(f)
+        return read_decision_file(decision_file)
     except Exception as e:
         print(f"读取文件失败: {e}")
         return None
 
 
-def analyze_decisions(data):
-    """分析决策数据"""
+def split_decisions(
+    data: List[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """单次遍历拆分出 (拒绝决策, 含信号分析的决策, 含MACD数据的决策)"""
+    rejections: List[Dict[str, Any]] = []
+    with_signal: List[Dict[str, Any]] = []
+    with_macd: List[Dict[str, Any]] = []
+    for item in data:
+        if item['decision'].startswith('REJECTED'):
+            rejections.append(item)
+        if 'signal_analysis' in item:
+            with_signal.append(item)
+        if 'macd_data' in item:
+            with_macd.append(item)
+    return rejections, with_signal, with_macd
+
+
+def analyze_decisions(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """分析决策数据，返回拒绝决策列表供案例展示复用"""
     if not data:
-        return
+        return []
 
     print(f"\n决策分析报告")
     print("=" * 60)
 
-    total_decisions = len(data)
-    decision_types = Counter(item['decision'] for item in data)
+    pair_counts = Counter((item['symbol'], item['decision']) for item in data)
+    decision_types: Counter[str] = Counter()
+    symbol_stats: Dict[str, Dict[str, int]] = defaultdict(dict)
+    for (symbol, decision), count in pair_counts.items():
+        decision_types[decision] += count
+        symbol_stats[symbol][decision] = count
 
+    total_decisions = len(data)
     print(f"总决策数: {total_decisions}")
     print(f"决策分布:")
     for decision, count in decision_types.most_common():
@@ -55,39 +88,38 @@ def analyze_decisions(data):
         print(f"   {decision}: {count} ({percentage:.1f}%)")
 
     print(f"\n📊 按股票分析:")
-    symbol_stats = defaultdict(lambda: defaultdict(int))
-    for item in data:
-        symbol = item['symbol']
-        decision = item['decision']
-        symbol_stats[symbol][decision] += 1
-
     for symbol, stats in symbol_stats.items():
-        total = sum(stats.values())
-        print(f"  {symbol}: 总计 {total}")
+        print(f"  {symbol}: 总计 {sum(stats.values())}")
         for decision, count in stats.items():
             print(f"    - {decision}: {count}")
 
+    rejections, with_signal, with_macd = split_decisions(data)
+
     print(f"\n🔍 拒绝原因详细分析:")
-    analyze_rejection_reasons(data)
+    analyze_rejection_reasons(rejections)
 
     print(f"\n📈 信心度分析:")
-    analyze_confidence_distribution(data)
+    analyze_confidence_distribution(with_signal)
 
     print(f"\n📊 MACD数据分析:")
-    analyze_macd_data(data)
+    analyze_macd_data(with_macd)
 
+    return rejections
 
-def analyze_rejection_reasons(data):
-    """分析拒绝原因"""
-    rejections = [item for item in data if item['decision'].startswith('REJECTED')]
 
+def analyze_rejection_reasons(rejections: List[Dict[str, Any]]) -> None:
+    """分析拒绝原因"""
     if not rejections:
         print("   ✅ 没有拒绝的决策")
         return
 
     print(f"   总拒绝数: {len(rejections)}")
 
-    strategy_rejections = [item for item in rejections if item['decision'] == 'REJECTED_BY_STRATEGY']
+    buckets: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for item in rejections:
+        buckets[item['decision']].append(item)
+
+    strategy_rejections = buckets['REJECTED_BY_STRATEGY']
     if strategy_rejections:
         print(f"\n   🚫 策略拒绝 ({len(strategy_rejections)}个):")
         for item in strategy_rejections:
@@ -96,7 +128,7 @@ def analyze_rejection_reasons(data):
             confidence = item.get('signal_analysis', {}).get('confidence', 0)
             print(f"     {symbol}: {reason} (信心度: {confidence:.3f})")
 
-    position_rejections = [item for item in rejections if item['decision'] == 'REJECTED_BY_POSITION_CALC']
+    position_rejections = buckets['REJECTED_BY_POSITION_CALC']
     if position_rejections:
         print(f"\n   💰 仓位计算拒绝 ({len(position_rejections)}个):")
         for item in position_rejections:
@@ -104,7 +136,7 @@ def analyze_rejection_reasons(data):
             reason = item.get('reason', '未知原因')
             print(f"     {symbol}: {reason}")
 
-    risk_rejections = [item for item in rejections if item['decision'] == 'REJECTED_BY_RISK_CHECK']
+    risk_rejections = buckets['REJECTED_BY_RISK_CHECK']
     if risk_rejections:
         print(f"\n   ⚠️  风险检查拒绝 ({len(risk_rejections)}个):")
         for item in risk_rejections:
@@ -119,25 +151,23 @@ def analyze_rejection_reasons(data):
                 print(f"       持仓价值: ${position_value:,.2f}")
 
 
-def analyze_confidence_distribution(data):
+def analyze_confidence_distribution(with_signal: Iterable[Dict[str, Any]]) -> None:
     """分析信心度分布"""
-    confidences = []
-
-    for item in data:
-        signal_analysis = item.get('signal_analysis', {})
-        if 'confidence' in signal_analysis:
-            confidences.append(signal_analysis['confidence'])
-
-    if not confidences:
+    confidences = np.fromiter(
+        (
+            item['signal_analysis']['confidence']
+            for item in with_signal
+            if 'confidence' in item.get('signal_analysis', {})
+        ),
+        dtype=np.float64,
+    )
+
+    if not confidences.size:
         print("   ❌ 无信心度数据")
         return
 
-    min_conf = min(confidences)
-    max_conf = max(confidences)
-    avg_conf = sum(confidences) / len(confidences)
-
-    print(f"   范围: {min_conf:.3f} - {max_conf:.3f}")
-    print(f"   平均: {avg_conf:.3f}")
+    print(f"   范围: {confidences.min():.3f} - {confidences.max():.3f}")
+    print(f"   平均: {confidences.mean():.3f}")
 
     ranges = [
         (0.0, 0.1, "极低"),
@@ -147,54 +177,46 @@ def analyze_confidence_distribution(data):
         (0.5, 0.8, "高"),
         (0.8, 1.0, "极高"),
     ]
+    counts = _count_in_ranges(confidences, CONFIDENCE_EDGES)
 
     print(f"   分布:")
-    for min_val, max_val, label in ranges:
-        count = sum(1 for c in confidences if min_val <= c < max_val)
+    for (min_val, max_val, label), count in zip(ranges, counts):
         if count > 0:
-            percentage = count / len(confidences) * 100
+            percentage = count / confidences.size * 100
             print(f"     {label} ({min_val:.1f}-{max_val:.1f}): {count} ({percentage:.1f}%)")
 
 
-def analyze_macd_data(data):
+def analyze_macd_data(with_macd: List[Dict[str, Any]]) -> None:
     """分析MACD数据"""
-    macd_data = []
-
-    for item in data:
-        if 'macd_data' in item:
-            macd_info = item['macd_data']
-            macd_info['symbol'] = item['symbol']
-            macd_info['decision'] = item['decision']
-            macd_data.append(macd_info)
-
-    if not macd_data:
+    if not with_macd:
         print("   ❌ 无MACD数据")
         return
 
-    histograms = [abs(item['hist']) for item in macd_data]
+    decisions = [item['decision'] for item in with_macd]
+    histograms = np.fromiter(
+        (abs(item['macd_data']['hist']) for item in with_macd),
+        dtype=np.float64,
+        count=len(with_macd),
+    )
 
     print(f"   Histogram绝对值统计:")
-    print(f"     范围: {min(histograms):.6f} - {max(histograms):.6f}")
-    print(f"     平均: {sum(histograms)/len(histograms):.6f}")
+    print(f"     范围: {histograms.min():.6f} - {histograms.max():.6f}")
+    print(f"     平均: {histograms.mean():.6f}")
 
     print(f"\n   按决策类型分析:")
-    decision_macd = defaultdict(list)
-    for item in macd_data:
-        decision_macd[item['decision']].append(abs(item['hist']))
+    labels, first_seen, inverse = np.unique(decisions, return_index=True, return_inverse=True)
+    sums = np.bincount(inverse, weights=histograms)
+    sizes = np.bincount(inverse)
 
-    for decision, hist_values in decision_macd.items():
-        if hist_values:
-            avg_hist = sum(hist_values) / len(hist_values)
-            print(f"     {decision}: 平均|hist| = {avg_hist:.6f} ({len(hist_values)}个)")
+    for idx in np.argsort(first_seen):
+        print(f"     {labels[idx]}: 平均|hist| = {sums[idx] / sizes[idx]:.6f} ({sizes[idx]}个)")
 
 
-def show_specific_examples(data, num_examples=5):
+def show_specific_examples(rejections: List[Dict[str, Any]], num_examples: int = 5) -> None:
     """显示具体的拒绝案例"""
     print(f"\n📝 具体案例分析 (显示前{num_examples}个):")
     print("-" * 60)
 
-    rejections = [item for item in data if item['decision'].startswith('REJECTED')]
-
     for i, item in enumerate(rejections[:num_examples]):
         print(f"\n案例 {i+1}: {item['symbol']}")
         print(f"  决策: {item['decision']}")
@@ -233,8 +255,8 @@ def main():
     if not data:
         return
 
-    analyze_decisions(data)
-    show_specific_examples(data, args.examples)
+    rejections = analyze_decisions(data)
+    show_specific_examples(rejections, args.examples)
 
     print(f"\n✅ 分析完成")
 
@@ -1,24 +1,74 @@
 #!/usr/bin/env python3
 """Inspect confidence scores derived from MACD histogram magnitudes."""
 
-import json
 from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+
+from quant_trading.analytics.decision_logs import latest_decision_file, read_decision_file
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 LOGS_DIR = PROJECT_ROOT / "trading_logs"
 
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - fallback when numba is not installed
+    njit = None
+
+HIST_EDGES = np.array([0.0, 0.01, 0.03, 0.06, 0.15, 0.3, 1.0])
+
+
+def _hist_stats(values: np.ndarray, edges: np.ndarray) -> Tuple[float, float, float, np.ndarray]:
+    """单次遍历计算 (最小值, 最大值, 平均值, 各区间计数)，区间为 [edges[k], edges[k+1])"""
+    n_bins = edges.size - 1
+    counts = np.zeros(n_bins, np.int64)
+    mn = np.inf
+    mx = -np.inf
+    total = 0.0
+    for i in range(values.size):
+        v = values[i]
+        if v < mn:
+            mn = v
+        if v > mx:
+            mx = v
+        total += v
+        if v < edges[0] or v >= edges[n_bins]:
+            continue
+        lo = 0
+        hi = n_bins
+        while hi - lo > 1:
+            mid = (lo + hi) // 2
+            if v < edges[mid]:
+                hi = mid
+            else:
+                lo = mid
+        counts[lo] += 1
+    mean = total / values.size if values.size else 0.0
+    return mn, mx, mean, counts
+
+
+def _hist_stats_numpy(values: np.ndarray, edges: np.ndarray) -> Tuple[float, float, float, np.ndarray]:
+    """未安装numba时的等价实现：每个统计量都是一次C层遍历"""
+    bins = np.searchsorted(edges, values, side='right') - 1
+    in_range = (bins >= 0) & (bins < edges.size - 1)
+    counts = np.bincount(bins[in_range], minlength=edges.size - 1)
+    if not values.size:
+        return np.inf, -np.inf, 0.0, counts
+    return values.min(), values.max(), values.mean(), counts
+
+
+hist_stats = njit(cache=True)(_hist_stats) if njit is not None else _hist_stats_numpy
+
 
 def analyze_confidence():
     """分析信心度计算"""
-    decision_files = list(LOGS_DIR.glob('trading_decisions_*.json'))
-    if not decision_files:
+    decision_file = latest_decision_file(LOGS_DIR)
+    if decision_file is None:
         print("未找到交易决策文件")
         return
 
-    decision_file = max(decision_files, key=lambda f: f.stat().st_mtime)
-
-    with open(decision_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = read_decision_file(decision_file)
 
     print("信心度计算详细分析")
     print("=" * 60)
@@ -59,8 +109,17 @@ def analyze_confidence():
     print(f"\nHistogram绝对值分布分析:")
     print("-" * 60)
 
-    hist_values = [abs(item['hist']) for item in data_with_confidence]
-    hist_values.sort()
+    hist_values = np.fromiter(
+        (abs(item['hist']) for item in data_with_confidence),
+        dtype=np.float64,
+        count=len(data_with_confidence),
+    )
+    if not hist_values.size:
+        print("无信心度数据")
+        return
+
+    min_hist, max_hist, mean_hist, counts = hist_stats(hist_values, HIST_EDGES)
+    print(f"范围: {min_hist:.6f} - {max_hist:.6f}, 平均: {mean_hist:.6f}")
 
     ranges = [
         (0.0, 0.01, "极小"),
@@ -71,10 +130,9 @@ def analyze_confidence():
         (0.3, 1.0, "很大"),
     ]
 
-    for min_val, max_val, label in ranges:
-        count = sum(1 for h in hist_values if min_val <= h < max_val)
+    for (min_val, max_val, label), count in zip(ranges, counts):
         if count > 0:
-            percentage = count / len(hist_values) * 100
+            percentage = count / hist_values.size * 100
             min_conf = min(0.8, min_val / 0.3)
             max_conf = min(0.8, max_val / 0.3)
             print(f"{label:4s} ({min_val:.2f}-{max_val:.2f}): {count:2d}个 ({percentage:4.1f}%) "
@@ -83,12 +141,12 @@ def analyze_confidence():
     print(f"\n问题分析:")
     print("-" * 60)
 
-    very_small = sum(1 for h in hist_values if h < 0.06)
-    print(f"Histogram < 0.06 (信心度<0.2): {very_small}个 ({very_small/len(hist_values)*100:.1f}%)")
+    very_small = int(counts[:3].sum())
+    print(f"Histogram < 0.06 (信心度<0.2): {very_small}个 ({very_small/hist_values.size*100:.1f}%)")
     print(f"这意味着MACD和Signal线非常接近，几乎没有明显的金叉/死叉信号")
 
-    tiny = sum(1 for h in hist_values if h < 0.01)
-    print(f"Histogram < 0.01 (信心度<0.033): {tiny}个 ({tiny/len(hist_values)*100:.1f}%)")
+    tiny = int(counts[0])
+    print(f"Histogram < 0.01 (信心度<0.033): {tiny}个 ({tiny/hist_values.size*100:.1f}%)")
     print(f"这些可能是噪音信号，不是真正的趋势变化")
 
 
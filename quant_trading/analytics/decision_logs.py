@@ -0,0 +1,63 @@
+"""Shared helpers for reading ``trading_decisions_*.json`` logs."""
+
+import json
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - fallback when orjson is not installed
+    orjson = None
+
+try:
+    import ijson
+except ImportError:  # pragma: no cover - streaming is optional
+    ijson = None
+
+
+DECISION_FILE_PREFIX = "trading_decisions_"
+
+
+def latest_decision_file(logs_dir: Union[str, Path]) -> Optional[Path]:
+    """返回目录中最近修改的交易决策文件，没有时返回None
+
+    结果按目录mtime缓存，同一进程内多个分析器重复调用时不会再次扫描目录。
+    """
+    try:
+        dir_mtime_ns = os.stat(logs_dir).st_mtime_ns
+    except FileNotFoundError:
+        return None
+    return _scan_latest_decision_file(os.fspath(logs_dir), dir_mtime_ns)
+
+
+@lru_cache(maxsize=1)
+def _scan_latest_decision_file(logs_dir: str, dir_mtime_ns: int) -> Optional[Path]:
+    with os.scandir(logs_dir) as entries:
+        candidates = [
+            entry
+            for entry in entries
+            if entry.name.startswith(DECISION_FILE_PREFIX) and entry.name.endswith(".json")
+        ]
+    if not candidates:
+        return None
+    return Path(max(candidates, key=lambda entry: entry.stat().st_mtime).path)
+
+
+def read_decision_file(decision_file: Union[str, Path]) -> List[Dict[str, Any]]:
+    """解析交易决策JSON文件 (优先使用orjson)"""
+    decision_file = Path(decision_file)
+    if orjson is not None:
+        return orjson.loads(decision_file.read_bytes())
+    with open(decision_file, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def iter_decision_file(decision_file: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """逐条流式读取交易决策，适用于超大日志 (未安装ijson时退回整体解析)"""
+    if ijson is None:
+        yield from read_decision_file(decision_file)
+        return
+    with open(decision_file, "rb") as f:
+        yield from ijson.items(f, "item", use_float=True)
@@ -1,42 +1,71 @@
 #!/usr/bin/env python3
 """Lightweight report over recent trading decisions."""
 
-import json
+from array import array
 from pathlib import Path
-from collections import Counter
+from collections import Counter, defaultdict
+import argparse
+
+from quant_trading.analytics.decision_logs import iter_decision_file, latest_decision_file, read_decision_file
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 LOGS_DIR = PROJECT_ROOT / "trading_logs"
 
 
-def load_latest_decision_data():
-    """加载最新的交易决策数据"""
-    decision_files = list(LOGS_DIR.glob('trading_decisions_*.json'))
-    if not decision_files:
+def load_latest_decision_data(stream=False):
+    """加载最新的交易决策数据 (stream=True 时返回逐条读取的迭代器)"""
+    decision_file = latest_decision_file(LOGS_DIR)
+    if decision_file is None:
         print("未找到交易决策文件")
         return None
 
-    decision_file = max(decision_files, key=lambda f: f.stat().st_mtime)
     print(f"分析文件: {decision_file}")
 
+    if stream:
+        return iter_decision_file(decision_file)
+
     try:
-        with open(decision_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return read_decision_file(decision_file)
     except Exception as e:
         print(f"读取文件失败: {e}")
         return None
 
 
-def main():
+def main(stream=False):
     print("交易决策分析器")
     print("=" * 50)
 
-    data = load_latest_decision_data()
+    data = load_latest_decision_data(stream=stream)
     if not data:
         return
 
-    total_decisions = len(data)
-    decision_types = Counter(item['decision'] for item in data)
+    total_decisions = 0
+    decision_types = Counter()
+    rejections = []
+    buckets = defaultdict(list)
+    confidences = array('d')
+    items = iter(data)
+    while True:
+        # 流式读取时解析错误在迭代过程中才抛出，与一次性读取一样提示后退出
+        try:
+            item = next(items)
+        except StopIteration:
+            break
+        except Exception as e:
+            print(f"读取文件失败: {e}")
+            return
+        total_decisions += 1
+        decision = item['decision']
+        decision_types[decision] += 1
+        if decision.startswith('REJECTED'):
+            rejections.append(item)
+            buckets[decision].append(item)
+        signal_analysis = item.get('signal_analysis', {})
+        if 'confidence' in signal_analysis:
+            confidences.append(signal_analysis['confidence'])
+
+    if not total_decisions:
+        return
 
     print(f"\n总决策数: {total_decisions}")
     print("决策分布:")
@@ -46,15 +75,13 @@ def main():
 
     print(f"\n拒绝原因详细分析:")
 
-    rejections = [item for item in data if item['decision'].startswith('REJECTED')]
-
     if not rejections:
         print("  没有拒绝的决策")
         return
 
     print(f"  总拒绝数: {len(rejections)}")
 
-    strategy_rejections = [item for item in rejections if item['decision'] == 'REJECTED_BY_STRATEGY']
+    strategy_rejections = buckets['REJECTED_BY_STRATEGY']
     if strategy_rejections:
         print(f"\n  策略拒绝 ({len(strategy_rejections)}个):")
         for item in strategy_rejections:
@@ -63,7 +90,7 @@ def main():
             confidence = item.get('signal_analysis', {}).get('confidence', 0)
             print(f"    {symbol}: {reason} (信心度: {confidence:.3f})")
 
-    risk_rejections = [item for item in rejections if item['decision'] == 'REJECTED_BY_RISK_CHECK']
+    risk_rejections = buckets['REJECTED_BY_RISK_CHECK']
     if risk_rejections:
         print(f"\n  风险检查拒绝 ({len(risk_rejections)}个):")
         for item in risk_rejections:
@@ -78,13 +105,6 @@ def main():
                 print(f"      持仓价值: ${position_value:,.2f}, 风险金额: ${risk_amount:,.2f}")
 
     print(f"\n信心度分析:")
-    confidences = []
-
-    for item in data:
-        signal_analysis = item.get('signal_analysis', {})
-        if 'confidence' in signal_analysis:
-            confidences.append(signal_analysis['confidence'])
-
     if confidences:
         min_conf = min(confidences)
         max_conf = max(confidences)
@@ -120,4 +140,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description='交易决策简要分析')
+    parser.add_argument('--stream', action='store_true', help='流式读取超大的决策日志 (需要ijson)')
+    main(stream=parser.parse_args().stream)
@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """Diagnose why MACD signals didn't result in trades."""
 
+import numpy as np
 import pandas as pd
 import os
 from pathlib import Path
@@ -11,15 +12,23 @@ PROJECT_ROOT = Path(__file__).resolve().parents[2]
 MARKET_DATA_DIR = PROJECT_ROOT / "market_data"
 
 
-def analyze_csv_signals(csv_file):
-    """分析CSV文件中的MACD信号"""
+def analyze_csv_signals(csv_file, strategy_name=None, timeframe=None):
+    """分析CSV文件中的MACD信号
+
+    批量分析时由调用方传入已加载的策略名称与时间框架，避免每个文件重复读取策略配置。
+    """
 
     if not os.path.exists(csv_file):
         print(f"文件不存在: {csv_file}")
         return
 
     try:
-        df = pd.read_csv(csv_file)
+        df = pd.read_csv(
+            csv_file,
+            usecols=['datetime', 'macd', 'signal', 'hist'],
+            dtype={'macd': np.float64, 'signal': np.float64, 'hist': np.float64},
+            engine='c',
+        )
         print(f"\n[Analysis] 分析文件: {csv_file}")
         print(f"总K线数: {len(df)}")
 
@@ -28,60 +37,45 @@ def analyze_csv_signals(csv_file):
             print(f"[Warning] K线数量({len(df)}) <= 热身期({warmup_bars})，无交易信号")
             return
 
-        df_valid = df.iloc[warmup_bars:].copy()
+        df_valid = df.iloc[warmup_bars:]
         print(f"热身期后有效K线数: {len(df_valid)}")
 
-        strategy_name, _, strategy_config = load_strategy()
-        timeframe = strategy_config.get("TIMEFRAME", "5") if strategy_config else "5"
+        if strategy_name is None:
+            strategy_name, _, strategy_config = load_strategy()
+            timeframe = strategy_config.get("TIMEFRAME", "5") if strategy_config else "5"
         print(f"使用策略: {strategy_name} (时间框架: {timeframe}m)")
-        signals_found = 0
-        high_confidence_signals = 0
 
         print(f"\n[Signal Check] 逐K线分析信号:")
         print("时间\t\t\t动作\t信心度\t原因")
         print("-" * 80)
 
-        for i in range(1, len(df_valid)):
-            current = df_valid.iloc[i]
-            previous = df_valid.iloc[i - 1]
-
-            if pd.isna(current['macd']) or pd.isna(current['signal']) or pd.isna(current['hist']):
-                continue
-
-            if pd.isna(previous['macd']) or pd.isna(previous['signal']) or pd.isna(previous['hist']):
-                continue
-
-            symbol = os.path.basename(csv_file).split('_')[0].upper()
-
-            macd = current['macd']
-            signal_line = current['signal']
-            hist = current['hist']
-            close_price = current['close']
-
-            last_hist = previous['hist']
-            last_macd = previous['macd']
-
-            if (hist > 0 and last_hist <= 0 and macd > signal_line and macd > last_macd):
-
-                confidence = min(0.8, abs(hist) / 0.5)
-                signals_found += 1
-
-                status = "[PASS]" if confidence >= 0.3 else "[REJECT]"
-                if confidence >= 0.3:
-                    high_confidence_signals += 1
+        macd = df_valid['macd'].to_numpy()
+        signal_line = df_valid['signal'].to_numpy()
+        hist = df_valid['hist'].to_numpy()
+        datetimes = df_valid['datetime'].to_numpy()
 
-                print(f"{current['datetime']}\tBUY\t{confidence:.3f}\t{status} - MACD金叉 + histogram转正")
+        complete = ~(np.isnan(macd) | np.isnan(signal_line) | np.isnan(hist))
+        valid = complete[1:] & complete[:-1]
 
-            elif (hist < 0 and last_hist >= 0 and macd < signal_line and macd < last_macd):
+        cur_hist, last_hist = hist[1:], hist[:-1]
+        cur_macd, last_macd = macd[1:], macd[:-1]
+        cur_signal = signal_line[1:]
 
-                confidence = min(0.8, abs(hist) / 0.5)
-                signals_found += 1
+        buy_mask = valid & (cur_hist > 0) & (last_hist <= 0) & (cur_macd > cur_signal) & (cur_macd > last_macd)
+        sell_mask = valid & (cur_hist < 0) & (last_hist >= 0) & (cur_macd < cur_signal) & (cur_macd < last_macd)
+        signal_mask = buy_mask | sell_mask
+        confidence = np.minimum(0.8, np.abs(cur_hist) / 0.5)
+        passed = signal_mask & (confidence >= 0.3)
 
-                status = "[PASS]" if confidence >= 0.3 else "[REJECT]"
-                if confidence >= 0.3:
-                    high_confidence_signals += 1
+        signals_found = int(signal_mask.sum())
+        high_confidence_signals = int(passed.sum())
 
-                print(f"{current['datetime']}\tSELL\t{confidence:.3f}\t{status} - MACD死叉 + histogram转负")
+        for idx in np.flatnonzero(signal_mask):
+            status = "[PASS]" if passed[idx] else "[REJECT]"
+            if buy_mask[idx]:
+                print(f"{datetimes[idx + 1]}\tBUY\t{confidence[idx]:.3f}\t{status} - MACD金叉 + histogram转正")
+            else:
+                print(f"{datetimes[idx + 1]}\tSELL\t{confidence[idx]:.3f}\t{status} - MACD死叉 + histogram转负")
 
         print(f"\n[Statistics] 统计结果:")
         print(f"发现信号总数: {signals_found}")
@@ -134,7 +128,7 @@ def main():
     print(f"[Files] 找到 {len(csv_files)} 个数据文件")
 
     for csv_file in csv_files[:3]:
-        analyze_csv_signals(csv_file)
+        analyze_csv_signals(csv_file, strategy_name, timeframe_minutes)
 
     print(f"\n[Suggestions] 建议:")
     print("1. 降低信心度门槛: confidence < 0.3 → confidence < 0.2")
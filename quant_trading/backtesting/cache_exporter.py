@@ -2,30 +2,127 @@
 
 from __future__ import annotations
 
+import datetime
 import json
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Sequence
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import numpy as np
 import pandas as pd
 
-from .engine import BacktestResult, HistoricalDataLoader
+from .engine import BacktestResult, BacktestSummary, HistoricalDataLoader
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - fallback when orjson is not installed
+    orjson = None
 
-def _sanitize_trade(trade: Dict[str, object]) -> Dict[str, object]:
-    cleaned = dict(trade)
-    for key in ("entry_time", "exit_time", "timestamp"):
-        if key in cleaned and cleaned[key] is not None:
-            cleaned[key] = pd.to_datetime(cleaned[key]).isoformat()
-    return cleaned
 
+def _json_default(value: Any) -> Any:
+    """Serialize timestamps and numpy scalars that the JSON encoders reject."""
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
 
-def _serialize_candles(df: pd.DataFrame) -> List[Dict[str, object]]:
-    frame = df.copy()
-    frame["datetime"] = frame["datetime"].apply(lambda ts: pd.to_datetime(ts).isoformat())
-    for column in ["open", "high", "low", "close", "volume"]:
-        if column in frame.columns:
-            frame[column] = frame[column].astype(float)
-    return frame[["datetime", "open", "high", "low", "close", "volume"]].to_dict(orient="records")
+
+def _dump_payload(payload: Dict[str, Any], candles_json: str) -> bytes:
+    """Serialize the metadata payload and splice the pre-rendered candles array in as the last key."""
+    if orjson is not None:
+        head = orjson.dumps(
+            payload,
+            default=_json_default,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY,
+        )
+    else:
+        head = json.dumps(payload, indent=2, default=_json_default).encode("utf-8")
+    # Both encoders close an indented object with "\n}"; reopen it to append "candles".
+    return head[:-2] + b',\n  "candles": ' + candles_json.encode("utf-8") + b"\n}"
+
+
+CANDLE_COLUMNS = ["open", "high", "low", "close", "volume"]
+
+
+def _candles_json(df: pd.DataFrame) -> str:
+    """Render candles as a JSON records array directly from pandas' C encoder."""
+    frame = pd.DataFrame(
+        {"datetime": pd.to_datetime(df["datetime"]).dt.strftime("%Y-%m-%dT%H:%M:%S")}
+    )
+    for column in CANDLE_COLUMNS:
+        frame[column] = df[column].to_numpy(dtype=np.float64)
+    return frame.to_json(orient="records")
+
+
+def _slice_period(candles: pd.DataFrame, start: pd.Timestamp, end: pd.Timestamp) -> pd.DataFrame:
+    """Return the rows within [start, end], using a binary search when the data is sorted."""
+    timestamps = candles["datetime"]
+    if not timestamps.is_monotonic_increasing:
+        return candles[(timestamps >= start) & (timestamps <= end)]
+    lo = timestamps.searchsorted(start, side="left")
+    hi = timestamps.searchsorted(end, side="right")
+    return candles.iloc[lo:hi]
+
+
+def _index_symbol_results(
+    result: BacktestResult,
+) -> Dict[str, Tuple[Optional[BacktestSummary], List[Dict[str, Any]]]]:
+    """Group summaries and closed trades by upper-cased symbol in one pass each."""
+    index: Dict[str, Tuple[Optional[BacktestSummary], List[Dict[str, Any]]]] = defaultdict(lambda: (None, []))
+    for trade in result.closed_trades:
+        index[str(trade.get("symbol", "")).upper()][1].append(trade)
+    for summary in result.summaries:
+        key = summary.symbol.upper()
+        index[key] = (summary, index[key][1])
+    return index
+
+
+def _export_symbol(
+    symbol_upper: str,
+    summary: Optional[BacktestSummary],
+    symbol_trades: List[Dict[str, Any]],
+    loader: HistoricalDataLoader,
+    result_fields: Dict[str, Any],
+    base_output: Path,
+    timeframe_norm: str,
+) -> Optional[Path]:
+    """Load, slice and write one symbol's cache file; returns None when no candles are available."""
+    try:
+        candles = loader.load_symbol(symbol_upper)
+    except FileNotFoundError:
+        return None
+
+    candles = _slice_period(candles, result_fields["period_start"], result_fields["period_end"])
+    if candles.empty:
+        return None
+
+    net_profit = summary.net_pnl if summary else 0.0
+    return_pct = summary.return_pct if summary else 0.0
+    win_rate = summary.win_rate if summary else None
+    total_trades = summary.total_trades if summary else len(symbol_trades)
+
+    payload = {
+        "symbol": symbol_upper,
+        "timeframe": timeframe_norm,
+        "start": result_fields["start"],
+        "end": result_fields["end"],
+        "initial_capital": result_fields["initial_capital"],
+        "ending_equity": result_fields["ending_equity"],
+        "net_profit": net_profit,
+        "return_pct": return_pct,
+        "win_rate": win_rate,
+        "total_trades": total_trades,
+        "max_drawdown": result_fields["max_drawdown"],
+        "closed_trades": symbol_trades,
+    }
+
+    symbol_lower = symbol_upper.lower()
+    cache_path = base_output / f"{symbol_lower}_{timeframe_norm}_backtest.json"
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    cache_path.write_bytes(_dump_payload(payload, _candles_json(candles)))
+    return cache_path
 
 
 def export_backtest_caches(
@@ -36,60 +133,42 @@ def export_backtest_caches(
     timeframe: str,
     strategy_name: str,
     output_dir: Path | str,
+    max_workers: Optional[int] = 1,
 ) -> List[Path]:
-    """Write per-symbol cache files compatible with the visualization tools."""
+    """Write per-symbol cache files compatible with the visualization tools.
+
+    Symbols are independent, so ``max_workers`` other than 1 exports them in a
+    process pool (``None`` lets the executor pick the worker count). The loader
+    must be picklable in that case.
+    """
 
     timeframe_norm = timeframe.strip().lower()
     strategy_norm = strategy_name.upper()
     base_output = Path(output_dir) / strategy_norm / timeframe_norm
     base_output.mkdir(parents=True, exist_ok=True)
 
-    summary_map = {summary.symbol.upper(): summary for summary in result.summaries}
-
-    written: List[Path] = []
-    for symbol in symbols:
-        symbol_upper = symbol.upper()
-        symbol_trades: List[Dict[str, object]] = [
-            trade for trade in result.closed_trades if str(trade.get("symbol", "")).upper() == symbol_upper
-        ]
-
-        try:
-            candles = loader.load_symbol(symbol_upper)
-        except FileNotFoundError:
-            continue
-
-        candles = candles[(candles["datetime"] >= result.start) & (candles["datetime"] <= result.end)].copy()
-        if candles.empty:
-            continue
-
-        summary = summary_map.get(symbol_upper)
-
-        net_profit = summary.net_pnl if summary else 0.0
-        return_pct = summary.return_pct if summary else 0.0
-        win_rate = summary.win_rate if summary else None
-        total_trades = summary.total_trades if summary else len(symbol_trades)
-
-        payload = {
-            "symbol": symbol_upper,
-            "timeframe": timeframe_norm,
-            "start": pd.to_datetime(result.start).isoformat(),
-            "end": pd.to_datetime(result.end).isoformat(),
-            "initial_capital": result.initial_capital,
-            "ending_equity": result.ending_equity,
-            "net_profit": net_profit,
-            "return_pct": return_pct,
-            "win_rate": win_rate,
-            "total_trades": total_trades,
-            "max_drawdown": result.max_drawdown,
-            "closed_trades": [_sanitize_trade(trade) for trade in symbol_trades],
-            "candles": _serialize_candles(candles),
-        }
-
-        symbol_lower = symbol_upper.lower()
-        cache_path = base_output / f"{symbol_lower}_{timeframe_norm}_backtest.json"
-        cache_path.parent.mkdir(parents=True, exist_ok=True)
-        with cache_path.open("w", encoding="utf-8") as handle:
-            json.dump(payload, handle, indent=2)
-        written.append(cache_path)
-
-    return written
\ No newline at end of file
+    results_by_symbol = _index_symbol_results(result)
+    result_fields = {
+        "period_start": result.start,
+        "period_end": result.end,
+        "start": pd.to_datetime(result.start).isoformat(),
+        "end": pd.to_datetime(result.end).isoformat(),
+        "initial_capital": result.initial_capital,
+        "ending_equity": result.ending_equity,
+        "max_drawdown": result.max_drawdown,
+    }
+
+    tasks = [
+        (symbol.upper(), *results_by_symbol.get(symbol.upper(), (None, [])))
+        for symbol in symbols
+    ]
+    shared = (loader, result_fields, base_output, timeframe_norm)
+
+    if max_workers == 1 or len(tasks) <= 1:
+        paths = [_export_symbol(*task, *shared) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_export_symbol, *task, *shared) for task in tasks]
+            paths = [future.result() for future in futures]
+
+    return [path for path in paths if path is not None]
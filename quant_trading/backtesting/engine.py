@@ -2,11 +2,14 @@
 
 from __future__ import annotations
 
-import math
+import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Sequence
 
+import numpy as np
 import pandas as pd
 
 from quant_trading.config.strategy_defaults import (
@@ -16,6 +19,16 @@ from quant_trading.config.strategy_defaults import (
 )
 from quant_trading.core.risk_manager import RiskManager
 from quant_trading.strategies.base import BaseStrategy
+from quant_trading.utils.ewma import compute_macd
+
+try:
+    import pyarrow  # noqa: F401
+except ImportError:  # pragma: no cover - pyarrow is optional
+    CSV_ENGINE = "c"
+else:
+    CSV_ENGINE = "pyarrow"
+
+PRICE_COLUMNS = ["open", "high", "low", "close", "volume"]
 
 
 @dataclass
@@ -94,19 +107,130 @@ class BacktestResult:
         print("\n".join(lines))
 
 
+@lru_cache(maxsize=32)
+def _load_symbol_frame(
+    path: str,
+    mtime_ns: int,
+    symbol: str,
+    timeframe: str,
+    cache_dir: Optional[str],
+    chunksize: Optional[int] = None,
+) -> pd.DataFrame:
+    """Parse one symbol's bars, memoized in-process and optionally on disk.
+
+    Both cache layers are keyed by the source file's mtime, so refreshed CSVs
+    are picked up automatically.
+    """
+    cache_path: Optional[Path] = None
+    if cache_dir is not None:
+        macd_params = f"{MACD_FAST_PERIOD}-{MACD_SLOW_PERIOD}-{MACD_SIGNAL_PERIOD}"
+        cache_path = Path(cache_dir) / f"{symbol.lower()}_{timeframe}_{macd_params}_{mtime_ns}.parquet"
+        if cache_path.exists():
+            return pd.read_parquet(cache_path)
+
+    df = HistoricalDataLoader._parse_symbol(Path(path), symbol, chunksize)
+
+    if cache_path is not None:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(cache_path, compression="zstd", index=False)
+        except (ImportError, OSError) as exc:
+            print(f"[HistoricalDataLoader] Skipping parquet cache for {symbol}: {exc}")
+    return df
+
+
+class Position:
+    """Open position state for one symbol during a backtest."""
+
+    __slots__ = ("quantity", "avg_price", "entry_time")
+
+    def __init__(self, quantity: int = 0, avg_price: float = 0.0, entry_time: Optional[pd.Timestamp] = None) -> None:
+        self.quantity = quantity
+        self.avg_price = avg_price
+        self.entry_time = entry_time
+
+
+@dataclass
+class TradeLog:
+    """Column-oriented trade journal filled while a backtest runs."""
+
+    FIELDS = (
+        "timestamp",
+        "symbol",
+        "action",
+        "quantity",
+        "price",
+        "cash_after",
+        "market_value_after",
+        "equity_after",
+        "reason",
+        "trade_type",
+        "position_after",
+    )
+
+    timestamps: List[pd.Timestamp] = field(default_factory=list)
+    symbols: List[str] = field(default_factory=list)
+    actions: List[str] = field(default_factory=list)
+    quantities: List[int] = field(default_factory=list)
+    prices: List[float] = field(default_factory=list)
+    cash_after: List[float] = field(default_factory=list)
+    market_value_after: List[float] = field(default_factory=list)
+    equity_after: List[float] = field(default_factory=list)
+    reasons: List[str] = field(default_factory=list)
+    trade_types: List[str] = field(default_factory=list)
+    position_after: List[int] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def _columns(self) -> tuple:
+        return (
+            self.timestamps,
+            self.symbols,
+            self.actions,
+            self.quantities,
+            self.prices,
+            self.cash_after,
+            self.market_value_after,
+            self.equity_after,
+            self.reasons,
+            self.trade_types,
+            self.position_after,
+        )
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        return [dict(zip(self.FIELDS, row)) for row in zip(*self._columns())]
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(dict(zip(self.FIELDS, self._columns())), columns=list(self.FIELDS))
+
+
 class HistoricalDataLoader:
-    """Load historical bar data from CSV files."""
+    """Load historical bar data from CSV (or Parquet) files."""
 
-    def __init__(self, base_dir: Path | str = "market_data", timeframe: str = "5m") -> None:
+    def __init__(
+        self,
+        base_dir: Path | str = "market_data",
+        timeframe: str = "5m",
+        cache_dir: Path | str | None = None,
+        chunksize: Optional[int] = None,
+    ) -> None:
         self.base_dir = Path(base_dir)
         self.timeframe = timeframe.strip().lower()
+        # Optional directory for parquet snapshots of the MACD-annotated frames.
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        # Rows per batch when streaming large CSVs; None parses in one go.
+        self.chunksize = chunksize
 
     def _resolve_path(self, symbol: str) -> Path:
-        filename = f"{symbol.lower()}_{self.timeframe}_bars_macd.csv"
+        stem = f"{symbol.lower()}_{self.timeframe}_bars_macd"
+        directories = [
+            self.base_dir,
+            self.base_dir / self.timeframe,
+            self.base_dir / self.timeframe.upper(),
+        ]
         candidates = [
-            self.base_dir / filename,
-            self.base_dir / self.timeframe / filename,
-            self.base_dir / self.timeframe.upper() / filename,
+            directory / f"{stem}{suffix}" for directory in directories for suffix in (".parquet", ".csv")
         ]
         for candidate in candidates:
             if candidate.exists():
@@ -119,8 +243,31 @@ class HistoricalDataLoader:
 
     def load_symbol(self, symbol: str) -> pd.DataFrame:
         path = self._resolve_path(symbol)
+        frame = _load_symbol_frame(
+            str(path),
+            path.stat().st_mtime_ns,
+            symbol.upper(),
+            self.timeframe,
+            str(self.cache_dir) if self.cache_dir is not None else None,
+            self.chunksize,
+        )
+        # The cached frame is shared between calls; hand out a private copy.
+        return frame.copy()
 
-        df = pd.read_csv(path, parse_dates=["datetime"])
+    @classmethod
+    def _parse_symbol(cls, path: Path, symbol: str, chunksize: Optional[int] = None) -> pd.DataFrame:
+        if chunksize and path.suffix == ".csv":
+            df = cls._read_bars_chunked(path, chunksize)
+        else:
+            df = cls._clean_bars(cls._read_bars(path), path)
+        df = df.sort_values("datetime").reset_index(drop=True)
+
+        df = cls._compute_macd(df)
+        df["symbol"] = symbol
+        return df
+
+    @staticmethod
+    def _clean_bars(df: pd.DataFrame, path: Path) -> pd.DataFrame:
         if "datetime" not in df.columns:
             raise ValueError(f"CSV {path} must include a 'datetime' column")
 
@@ -130,25 +277,52 @@ class HistoricalDataLoader:
         if missing:
             raise ValueError(f"CSV {path} is missing required columns: {missing}")
 
-        for column in ["open", "high", "low", "close", "volume"]:
-            df[column] = pd.to_numeric(df[column], errors="coerce")
-
-        df = df.dropna(subset=["close"]).copy()
-        df = df.sort_values("datetime").reset_index(drop=True)
+        for column in PRICE_COLUMNS:
+            if not pd.api.types.is_float_dtype(df[column]):
+                df[column] = pd.to_numeric(df[column], errors="coerce")
+
+        return df.dropna(subset=["close"])
+
+    @classmethod
+    def _read_bars_chunked(cls, path: Path, chunksize: int) -> pd.DataFrame:
+        # Stored indicator columns are recomputed after loading, so they are
+        # never materialised; each batch is cleaned before the next is read.
+        reader = pd.read_csv(
+            path,
+            chunksize=chunksize,
+            parse_dates=["datetime"],
+            usecols=lambda column: column not in {"macd", "signal", "hist"},
+        )
+        with reader:
+            frames = [cls._clean_bars(chunk, path) for chunk in reader]
+        return pd.concat(frames, ignore_index=True)
 
-        df = self._compute_macd(df)
-        df["symbol"] = symbol.upper()
-        return df
+    @staticmethod
+    def _read_bars(path: Path) -> pd.DataFrame:
+        if path.suffix == ".parquet":
+            return pd.read_parquet(path)
+        try:
+            return pd.read_csv(
+                path,
+                engine=CSV_ENGINE,
+                dtype=dict.fromkeys(PRICE_COLUMNS, "float64"),
+                parse_dates=["datetime"],
+            )
+        except ValueError:
+            # Non-numeric cells in a price column: re-read untyped and let
+            # _clean_bars coerce the bad values to NaN.
+            return pd.read_csv(path, parse_dates=["datetime"])
 
     @staticmethod
     def _compute_macd(df: pd.DataFrame) -> pd.DataFrame:
         df = df.drop(columns=["macd", "signal", "hist"], errors="ignore")
 
-        ema_fast = df["close"].ewm(span=MACD_FAST_PERIOD, adjust=False).mean()
-        ema_slow = df["close"].ewm(span=MACD_SLOW_PERIOD, adjust=False).mean()
-        macd = ema_fast - ema_slow
-        signal = macd.ewm(span=MACD_SIGNAL_PERIOD, adjust=False).mean()
-        hist = macd - signal
+        macd, signal, hist = compute_macd(
+            df["close"].to_numpy(dtype=np.float64),
+            MACD_FAST_PERIOD,
+            MACD_SLOW_PERIOD,
+            MACD_SIGNAL_PERIOD,
+        )
 
         df["macd"] = macd
         df["signal"] = signal
@@ -157,14 +331,24 @@ class HistoricalDataLoader:
 
     def load_symbols(self, symbols: Sequence[str]) -> pd.DataFrame:
         frames: List[pd.DataFrame] = []
-        for symbol in symbols:
-            try:
-                frames.append(self.load_symbol(symbol))
-            except FileNotFoundError:
-                continue
+        if not symbols:
+            raise FileNotFoundError("No historical data found for requested symbols.")
+        # read_csv and the MACD kernel release the GIL, so threads overlap the
+        # per-symbol parsing. Results are collected in request order to keep
+        # the concatenated frame deterministic.
+        max_workers = min(len(symbols), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self.load_symbol, symbol) for symbol in symbols]
+            for future in futures:
+                try:
+                    frames.append(future.result())
+                except FileNotFoundError:
+                    continue
         if not frames:
             raise FileNotFoundError("No historical data found for requested symbols.")
-        return pd.concat(frames, ignore_index=True)
+        # Every frame is already sorted by datetime, so a stable mergesort only
+        # has to merge the per-symbol runs.
+        return pd.concat(frames, ignore_index=True).sort_values("datetime", kind="mergesort", ignore_index=True)
 
 
 class BacktestEngine:
@@ -179,6 +363,7 @@ class BacktestEngine:
         initial_capital: float = 100_000.0,
         risk_manager: Optional[RiskManager] = None,
         commission_per_trade: float = 0.0,
+        skip_idle_bars: bool = True,
     ) -> None:
         self.strategy = strategy
         self.strategy_config = strategy_config or {}
@@ -186,32 +371,41 @@ class BacktestEngine:
         self.initial_capital = initial_capital
         self.risk_manager = risk_manager or RiskManager()
         self.commission = commission_per_trade
+        # Honour BaseStrategy.event_bar_mask and skip bars it leaves unflagged.
+        self.skip_idle_bars = skip_idle_bars
 
         self._reset_state()
 
     def _reset_state(self) -> None:
         self.cash: float = float(self.initial_capital)
-        self.positions: Dict[str, Dict[str, Any]] = {}
+        self.positions: Dict[str, Position] = {}
         self.latest_prices: Dict[str, float] = {}
+        self._market_value: float = 0.0
+        self.trade_log = TradeLog()
         self.trades: List[Dict[str, Any]] = []
         self.closed_trades: List[Dict[str, Any]] = []
-        self.equity_curve: List[Dict[str, Any]] = []
+        self.equity_curve: pd.DataFrame = pd.DataFrame()
         self.realized_pnl: float = 0.0
 
     def _ensure_symbol_slot(self, symbol: str) -> None:
         if symbol not in self.positions:
-            self.positions[symbol] = {
-                "quantity": 0,
-                "avg_price": 0.0,
-                "entry_time": None,
-            }
+            self.positions[symbol] = Position()
 
     def _current_market_value(self) -> float:
-        total = 0.0
-        for symbol, pos in self.positions.items():
-            price = self.latest_prices.get(symbol, pos["avg_price"])
-            total += pos["quantity"] * price
-        return total
+        """Mark-to-market value of open positions, maintained incrementally."""
+        return self._market_value
+
+    def _mark_price(self, symbol: str, price: float) -> None:
+        """Revalue the symbol's open position at a new price and remember it."""
+        pos = self.positions[symbol]
+        if pos.quantity:
+            previous = self.latest_prices.get(symbol, pos.avg_price)
+            self._market_value += pos.quantity * (price - previous)
+        self.latest_prices[symbol] = price
+
+    def _adjust_market_value(self, symbol: str, quantity_delta: int) -> None:
+        price = self.latest_prices.get(symbol, self.positions[symbol].avg_price)
+        self._market_value += quantity_delta * price
 
     def _record_trade(
         self,
@@ -224,20 +418,18 @@ class BacktestEngine:
         trade_type: str,
     ) -> None:
         market_value = self._current_market_value()
-        trade = {
-            "timestamp": timestamp,
-            "symbol": symbol,
-            "action": action,
-            "quantity": int(quantity),
-            "price": float(price),
-            "cash_after": float(self.cash),
-            "market_value_after": float(market_value),
-            "equity_after": float(self.cash + market_value),
-            "reason": reason,
-            "trade_type": trade_type,
-            "position_after": int(self.positions[symbol]["quantity"]),
-        }
-        self.trades.append(trade)
+        log = self.trade_log
+        log.timestamps.append(timestamp)
+        log.symbols.append(symbol)
+        log.actions.append(action)
+        log.quantities.append(int(quantity))
+        log.prices.append(float(price))
+        log.cash_after.append(float(self.cash))
+        log.market_value_after.append(float(market_value))
+        log.equity_after.append(float(self.cash + market_value))
+        log.reasons.append(reason)
+        log.trade_types.append(trade_type)
+        log.position_after.append(int(self.positions[symbol].quantity))
 
     def _close_position(
         self,
@@ -248,28 +440,30 @@ class BacktestEngine:
         reason: str,
     ) -> None:
         pos = self.positions[symbol]
-        if quantity <= 0 or pos["quantity"] == 0:
+        if quantity <= 0 or pos.quantity == 0:
             return
 
-        direction = "LONG" if pos["quantity"] > 0 else "SHORT"
-        qty_to_close = min(abs(pos["quantity"]), quantity)
-        avg_price = pos["avg_price"]
-        entry_time = pos["entry_time"]
+        direction = "LONG" if pos.quantity > 0 else "SHORT"
+        qty_to_close = min(abs(pos.quantity), quantity)
+        avg_price = pos.avg_price
+        entry_time = pos.entry_time
 
         if direction == "LONG":
             self.cash += qty_to_close * price - self.commission
             realized = (price - avg_price) * qty_to_close
-            pos["quantity"] -= qty_to_close
+            pos.quantity -= qty_to_close
+            self._adjust_market_value(symbol, -qty_to_close)
             action = "SELL"
         else:
             self.cash -= qty_to_close * price + self.commission
             realized = (avg_price - price) * qty_to_close
-            pos["quantity"] += qty_to_close
+            pos.quantity += qty_to_close
+            self._adjust_market_value(symbol, qty_to_close)
             action = "BUY"
 
-        if pos["quantity"] == 0:
-            pos["avg_price"] = 0.0
-            pos["entry_time"] = None
+        if pos.quantity == 0:
+            pos.avg_price = 0.0
+            pos.entry_time = None
 
         self.realized_pnl += realized
         self.closed_trades.append(
@@ -306,28 +500,30 @@ class BacktestEngine:
             if self.cash < cost:
                 return
             self.cash -= cost
-            new_qty = pos["quantity"] + quantity
-            if pos["quantity"] >= 0:
-                total_cost = pos["avg_price"] * pos["quantity"] + price * quantity
-                pos["avg_price"] = total_cost / max(new_qty, 1)
+            new_qty = pos.quantity + quantity
+            if pos.quantity >= 0:
+                total_cost = pos.avg_price * pos.quantity + price * quantity
+                pos.avg_price = total_cost / max(new_qty, 1)
             else:
-                pos["avg_price"] = price
-            pos["quantity"] = new_qty
-            pos["entry_time"] = timestamp
+                pos.avg_price = price
+            pos.quantity = new_qty
+            pos.entry_time = timestamp
+            self._adjust_market_value(symbol, quantity)
         else:  # SELL / opening short
             proceeds = quantity * price - self.commission
             self.cash += proceeds
-            new_qty = pos["quantity"] - quantity
-            if pos["quantity"] <= 0:
-                total_cost = abs(pos["avg_price"] * pos["quantity"]) + price * quantity
-                pos["avg_price"] = total_cost / max(abs(new_qty), 1)
+            new_qty = pos.quantity - quantity
+            if pos.quantity <= 0:
+                total_cost = abs(pos.avg_price * pos.quantity) + price * quantity
+                pos.avg_price = total_cost / max(abs(new_qty), 1)
             else:
-                pos["avg_price"] = price
-            pos["quantity"] = new_qty
-            if pos["quantity"] < 0:
-                pos["entry_time"] = timestamp
-            elif pos["quantity"] == 0:
-                pos["entry_time"] = None
+                pos.avg_price = price
+            pos.quantity = new_qty
+            self._adjust_market_value(symbol, -quantity)
+            if pos.quantity < 0:
+                pos.entry_time = timestamp
+            elif pos.quantity == 0:
+                pos.entry_time = None
 
         self._record_trade(timestamp, symbol, action, quantity, price, reason, trade_type)
 
@@ -343,15 +539,19 @@ class BacktestEngine:
 
         self.strategy.configure(self.strategy_config)
         self._reset_state()
-        for symbol in symbols:
-            self._ensure_symbol_slot(symbol.upper())
+        symbols_upper = [symbol.upper() for symbol in symbols]
+        for symbol in symbols_upper:
+            self._ensure_symbol_slot(symbol)
 
         data = self.data_loader.load_symbols(symbols)
         if data.empty:
             raise ValueError("No historical data available for backtest.")
 
         data["datetime"] = pd.to_datetime(data["datetime"], utc=False)
-        data = data.sort_values("datetime").reset_index(drop=True)
+        if not data["datetime"].is_monotonic_increasing:
+            # HistoricalDataLoader already returns time-ordered bars; only
+            # custom loaders pay for a sort here.
+            data = data.sort_values("datetime", kind="mergesort", ignore_index=True)
 
         max_date = data["datetime"].max()
 
@@ -367,38 +567,61 @@ class BacktestEngine:
         if data.empty:
             raise ValueError("Historical data is empty after applying date filters.")
 
-        for symbol in symbols:
-            subset = data[data["symbol"] == symbol.upper()]
-            if subset.empty:
-                continue
-            self.latest_prices[symbol.upper()] = float(subset.iloc[0]["close"])
-
-        for row in data.itertuples(index=False):
-            symbol = str(row.symbol).upper()
-            price = float(row.close)
-            timestamp = pd.Timestamp(row.datetime)
-
+        first_close = data.groupby("symbol", sort=False)["close"].first()
+        for symbol in symbols_upper:
+            if symbol in first_close.index:
+                self.latest_prices[symbol] = float(first_close[symbol])
+
+        bar_count = len(data)
+        timestamps = data["datetime"].to_numpy()
+        # Normalise each distinct symbol once; bars then index into the list.
+        symbol_codes, symbol_uniques = pd.factorize(data["symbol"], sort=False)
+        symbol_names = [str(value).upper() for value in symbol_uniques]
+        for symbol in symbol_names:
             self._ensure_symbol_slot(symbol)
-            self.latest_prices[symbol] = price
-
-            market_value = self._current_market_value()
-            equity_before = self.cash + market_value
-
-            account_info = {
-                "NetLiquidation": equity_before,
-                "AvailableFunds": self.cash,
-                "BuyingPower": self.cash,
-            }
+        symbol_positions = [self.positions[symbol] for symbol in symbol_names]
+        closes = data["close"].to_numpy(dtype=np.float64).tolist()
+        # Indicator warm-up NaNs are fed to the strategy as 0.0.
+        macd_array = np.nan_to_num(data["macd"].to_numpy(dtype=np.float64), nan=0.0)
+        signal_array = np.nan_to_num(data["signal"].to_numpy(dtype=np.float64), nan=0.0)
+        hist_array = np.nan_to_num(data["hist"].to_numpy(dtype=np.float64), nan=0.0)
+
+        event_mask = None
+        if self.skip_idle_bars:
+            event_mask = self.strategy.event_bar_mask(symbol_codes, macd_array, signal_array, hist_array)
+        active_bars = event_mask.tolist() if event_mask is not None else [True] * bar_count
+
+        symbol_codes = symbol_codes.tolist()
+        macd_values = macd_array.tolist()
+        signal_values = signal_array.tolist()
+        hist_values = hist_array.tolist()
+
+        # One equity slot per distinct timestamp. Bars are time-ordered, so a
+        # running count of timestamp changes gives each bar its slot; later
+        # symbols on the same bar overwrite it with the end-of-bar state.
+        new_bar = np.ones(bar_count, dtype=bool)
+        new_bar[1:] = timestamps[1:] != timestamps[:-1]
+        bar_slots = (np.cumsum(new_bar) - 1).tolist()
+        curve_timestamps = timestamps[new_bar]
+        cash_curve = np.empty(len(curve_timestamps), dtype=np.float64)
+        market_value_curve = np.empty(len(curve_timestamps), dtype=np.float64)
+
+        bars = zip(symbol_codes, closes, macd_values, signal_values, hist_values, bar_slots, active_bars)
+        for i, (symbol_code, price, macd, signal_val, hist, slot, active) in enumerate(bars):
+            symbol = symbol_names[symbol_code]
+            position = symbol_positions[symbol_code]
+            self._mark_price(symbol, price)
+
+            if not active:
+                cash_curve[slot] = self.cash
+                market_value_curve[slot] = self._market_value
+                continue
 
             pos_snapshot = {
-                "position": self.positions[symbol]["quantity"],
-                "avg_cost": self.positions[symbol]["avg_price"],
+                "position": position.quantity,
+                "avg_cost": position.avg_price,
             }
 
-            macd = float(row.macd) if not math.isnan(row.macd) else 0.0
-            signal_val = float(row.signal) if not math.isnan(row.signal) else 0.0
-            hist = float(row.hist) if not math.isnan(row.hist) else 0.0
-
             signal = self.strategy.analyze_position_and_signal(
                 symbol,
                 macd,
@@ -411,6 +634,8 @@ class BacktestEngine:
             trade_decision = self.strategy.should_trade(signal, pos_snapshot)
 
             if trade_decision.get("should_trade") and signal.get("action") in {"BUY", "SELL"}:
+                # Timestamps stay as datetime64 values until a trade needs one.
+                timestamp = pd.Timestamp(timestamps[i])
                 trade_type = signal.get("trade_type", "OPEN")
                 should_open_position = trade_type != "CLOSE"
 
@@ -418,20 +643,16 @@ class BacktestEngine:
                     close_qty = int(signal.get("close_quantity", abs(pos_snapshot["position"])))
                     if close_qty > 0:
                         self._close_position(symbol, timestamp, price, close_qty, signal.get("reason", trade_type))
-                        pos_snapshot = {
-                            "position": self.positions[symbol]["quantity"],
-                            "avg_cost": self.positions[symbol]["avg_price"],
-                        }
                     should_open_position = trade_type == "CLOSE_AND_REVERSE"
 
                 if should_open_position:
-                    account_info_after = {
-                        "NetLiquidation": self.cash + self._current_market_value(),
+                    account_info = {
+                        "NetLiquidation": self.cash + self._market_value,
                         "AvailableFunds": self.cash,
                         "BuyingPower": self.cash,
                     }
 
-                    position_calc = self.risk_manager.calculate_position_size(account_info_after, signal)
+                    position_calc = self.risk_manager.calculate_position_size(account_info, signal)
                     quantity = int(position_calc.get("quantity", 0)) if position_calc.get("valid") else 0
 
                     if quantity > 0:
@@ -445,19 +666,17 @@ class BacktestEngine:
                             trade_type,
                         )
 
-            market_value = self._current_market_value()
-            equity_after = self.cash + market_value
-            self.equity_curve.append(
-                {
-                    "datetime": timestamp,
-                    "cash": self.cash,
-                    "market_value": market_value,
-                    "equity": equity_after,
-                }
-            )
+            cash_curve[slot] = self.cash
+            market_value_curve[slot] = self._market_value
 
-        equity_df = pd.DataFrame(self.equity_curve).drop_duplicates("datetime")
-        equity_df = equity_df.sort_values("datetime").reset_index(drop=True)
+        equity_df = pd.DataFrame(
+            {
+                "datetime": curve_timestamps,
+                "cash": cash_curve,
+                "market_value": market_value_curve,
+                "equity": cash_curve + market_value_curve,
+            }
+        )
 
         if equity_df.empty:
             equity_df = pd.DataFrame(
@@ -505,28 +724,38 @@ class BacktestEngine:
             equity_df["baseline_equity"] = float(self.initial_capital)
 
         equity_df = equity_df.drop(columns=["date"])
+        self.equity_curve = equity_df
+
+        equity_values = equity_df["equity"].to_numpy(dtype=np.float64)
+        first_dt = equity_df["datetime"].iloc[0]
+        last_dt = equity_df["datetime"].iloc[-1]
 
-        ending_equity = float(equity_df.iloc[-1]["equity"])
+        ending_equity = float(equity_values[-1])
         net_profit = ending_equity - self.initial_capital
         total_return = net_profit / self.initial_capital if self.initial_capital else 0.0
 
-        num_days = max((equity_df.iloc[-1]["datetime"] - equity_df.iloc[0]["datetime"]).days, 1)
+        num_days = max((last_dt - first_dt).days, 1)
         growth_factor = 1.0 + total_return
         if num_days > 0 and growth_factor > 0:
             annualized_return = growth_factor ** (365 / num_days) - 1
         else:
             annualized_return = -1.0 if growth_factor < 0 else 0.0
 
-        peak = equity_df["equity"].cummax()
-        drawdown = (equity_df["equity"] - peak) / peak.replace(0, pd.NA)
-        max_drawdown = float(drawdown.min()) if not drawdown.isna().all() else 0.0
-        max_drawdown = abs(max_drawdown)
+        peak = np.maximum.accumulate(equity_values)
+        nonzero_peak = peak != 0
+        if nonzero_peak.any():
+            drawdown = (equity_values[nonzero_peak] - peak[nonzero_peak]) / peak[nonzero_peak]
+            max_drawdown = abs(float(drawdown.min()))
+        else:
+            max_drawdown = 0.0
 
         summaries = self._build_symbol_summaries()
+        # Consumers (web API, cache exporter) expect one dict per trade.
+        self.trades = self.trade_log.to_records()
 
         return BacktestResult(
-            start=equity_df.iloc[0]["datetime"],
-            end=equity_df.iloc[-1]["datetime"],
+            start=first_dt,
+            end=last_dt,
             initial_capital=self.initial_capital,
             ending_equity=ending_equity,
             net_profit=net_profit,
@@ -45,6 +45,16 @@ def build_parser() -> argparse.ArgumentParser:
         default="market_data",
         help="Directory containing historical CSV files (default: market_data)",
     )
+    parser.add_argument(
+        "--data-cache-dir",
+        help="Optional directory for parquet snapshots of parsed historical data, reused while the CSVs are unchanged",
+    )
+    parser.add_argument(
+        "--csv-chunksize",
+        type=int,
+        default=None,
+        help="Stream historical CSVs in batches of this many rows to bound memory on very large files",
+    )
     parser.add_argument(
         "--timeframe",
         default="5m",
@@ -66,6 +76,12 @@ def build_parser() -> argparse.ArgumentParser:
         action="store_true",
         help="Skip writing cached JSON output for visualization tools.",
     )
+    parser.add_argument(
+        "--export-workers",
+        type=int,
+        default=None,
+        help="Worker processes used to write per-symbol cache files (default: one per CPU)",
+    )
     return parser
 
 
@@ -96,7 +112,12 @@ def main(argv: List[str] | None = None) -> None:
     if config:
         strategy_instance.configure(config)
 
-    loader = HistoricalDataLoader(base_dir=args.data_dir, timeframe=args.timeframe)
+    loader = HistoricalDataLoader(
+        base_dir=args.data_dir,
+        timeframe=args.timeframe,
+        cache_dir=args.data_cache_dir,
+        chunksize=args.csv_chunksize,
+    )
 
     engine = BacktestEngine(
         strategy_instance,
@@ -117,6 +138,7 @@ def main(argv: List[str] | None = None) -> None:
             timeframe=args.timeframe,
             strategy_name=strategy_name,
             output_dir=args.cache_dir,
+            max_workers=args.export_workers,
         )
         if written:
             print("\nCached backtest data written to:")
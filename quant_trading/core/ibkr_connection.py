@@ -3,10 +3,33 @@
 
 from ibapi.client import EClient
 from ibapi.wrapper import EWrapper
+import sys
 import threading
 import time
 
 
+def intern_field(value):
+    """Intern repeated callback strings (symbols, currencies, statuses); pass other values through."""
+    return sys.intern(value) if type(value) is str else value
+
+
+# Signed share direction of an execution's ``side``.
+EXECUTION_SIDE_SIGN = {"BOT": 1, "SLD": -1}
+
+
+def rolled_average_cost(held, avg_cost, traded, price):
+    """Average cost after adding ``traded`` signed shares at ``price`` to ``held`` shares."""
+    new_position = held + traded
+    if held == 0 or (held > 0) == (traded > 0):
+        return (abs(held) * avg_cost + abs(traded) * price) / abs(new_position)
+    if new_position == 0:
+        return 0.0
+    if (new_position > 0) != (held > 0):
+        # Flipped through flat: the remainder was opened at this fill.
+        return price
+    return avg_cost
+
+
 class IBKRConnection(EWrapper, EClient):
     """Base class for IBKR TWS connections."""
 
@@ -15,6 +38,7 @@ class IBKRConnection(EWrapper, EClient):
         self.client_id = client_id
         self.connected = False
         self.next_order_id = None
+        self._connected_event = threading.Event()
 
     def error(self, reqId, errorCode, errorString, advancedOrderRejectJson=""):
         """Handle errors returned by the TWS API."""
@@ -25,6 +49,7 @@ class IBKRConnection(EWrapper, EClient):
         print(f"Connection successful! Next valid order ID: {orderId}")
         self.next_order_id = orderId
         self.connected = True
+        self._connected_event.set()
         self.on_connection_established()
 
     def on_connection_established(self):
@@ -39,11 +64,7 @@ class IBKRConnection(EWrapper, EClient):
             api_thread = threading.Thread(target=self.run, daemon=True)
             api_thread.start()
 
-            start_time = time.time()
-            while not self.connected and (time.time() - start_time) < timeout:
-                time.sleep(0.5)
-
-            if not self.connected:
+            if not self._connected_event.wait(timeout):
                 print(f"Connection timeout after {timeout} seconds")
                 return False
 
@@ -58,6 +79,7 @@ class IBKRConnection(EWrapper, EClient):
         if self.connected:
             self.disconnect()
             self.connected = False
+            self._connected_event.clear()
             print("Disconnected from TWS")
 
     def wait_for_completion(self, check_condition, timeout: int = 30, check_interval: int = 1) -> bool:
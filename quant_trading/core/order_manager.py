@@ -3,24 +3,177 @@
 
 from ibapi.order import Order
 from ibapi.contract import Contract
+import copy
+import functools
+import threading
 import time
+from collections import deque
+
+from .ibkr_connection import EXECUTION_SIDE_SIGN, intern_field, rolled_average_cost
+
+
+# Orders in these states no longer count as active.
+TERMINAL_ORDER_STATUSES = frozenset({"FILLED", "CANCELLED", "Filled", "Cancelled", "ApiCancelled"})
+
+
+# orderStatus message per IBKR status; anything else uses _DEFAULT_STATUS_MESSAGE.
+_STATUS_MESSAGES = {
+    "PreSubmitted": "📤 [{symbol}] 订单 {order_id} 已提交，等待执行...",
+    "Submitted": "⏳ [{symbol}] 订单 {order_id} 已确认，等待成交...",
+    "Filled": "✅ [{symbol}] 订单 {order_id} 已成交！\n   成交: {filled}股 @ ${avg_price:.2f}",
+    "Cancelled": "❌ [{symbol}] 订单 {order_id} 已取消",
+    "PendingCancel": "🔄 [{symbol}] 订单 {order_id} 取消中...",
+}
+_DEFAULT_STATUS_MESSAGE = "📊 [{symbol}] 订单 {order_id} 状态: {status}"
+
+
+def _order_template(**fields):
+    order = Order()
+    for name, value in fields.items():
+        setattr(order, name, value)
+    return order
+
+
+# Boilerplate for each order shape we send; _clone_order fills in the per-call fields.
+_MKT_TEMPLATE = _order_template(
+    orderType="MKT", tif="DAY", transmit=True, eTradeOnly=False, firmQuoteOnly=False, outsideRth=True
+)
+_LMT_TEMPLATE = _order_template(orderType="LMT", transmit=True)
+_LMT_CHILD_TEMPLATE = _order_template(orderType="LMT", transmit=True, outsideRth=True)
+_STP_CHILD_TEMPLATE = _order_template(orderType="STP", outsideRth=True)
+_STP_GTC_TEMPLATE = _order_template(orderType="STP", tif="GTC", transmit=True, outsideRth=True)
+
+
+def _clone_order(template, **fields):
+    """Shallow-copy an order template, giving the copy its own mutable members."""
+    order = copy.copy(template)
+    order.conditions = []
+    order.softDollarTier = copy.copy(template.softDollarTier)
+    for name, value in fields.items():
+        setattr(order, name, value)
+    return order
+
+
+class OrderInfo:
+    """Tracked state of one submitted or observed order."""
+
+    __slots__ = (
+        "symbol",
+        "action",
+        "quantity",
+        "order_type",
+        "status",
+        "timestamp",
+        "filled",
+        "remaining",
+        "avg_price",
+        "entry_price",
+        "stop_loss",
+        "take_profit",
+        "parent_id",
+        "stop_id",
+    )
+
+    def __init__(
+        self,
+        symbol,
+        action,
+        quantity,
+        order_type,
+        status,
+        timestamp,
+        entry_price=None,
+        stop_loss=None,
+        take_profit=None,
+        parent_id=None,
+        stop_id=None,
+    ):
+        self.symbol = symbol
+        self.action = action
+        self.quantity = quantity
+        self.order_type = order_type
+        self.status = status
+        self.timestamp = timestamp
+        self.filled = 0
+        self.remaining = 0
+        self.avg_price = 0.0
+        self.entry_price = entry_price
+        self.stop_loss = stop_loss
+        self.take_profit = take_profit
+        self.parent_id = parent_id
+        self.stop_id = stop_id
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def _batched_output(method):
+    """Collect the messages a call logs and print them in a single write."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        batch = self._output_batch
+        if getattr(batch, "lines", None) is not None:
+            return method(self, *args, **kwargs)
+        batch.lines = []
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            lines, batch.lines = batch.lines, None
+            if lines:
+                print("\n".join(lines))
+
+    return wrapper
 
 
 class OrderManager:
     """Track live IBKR orders and provide helpers for bracket/market submissions."""
 
-    def __init__(self, ibkr_client):
+    def __init__(self, ibkr_client, verbose=True):
         self.client = ibkr_client
+        # When False, _log returns before formatting anything.
+        self.verbose = verbose
         self.next_order_id = 1
         self.active_orders = {}
+        # Subset of active_orders that are still working, sharing the same OrderInfo objects.
+        self._open_orders = {}
         self.positions = {}
         self.has_valid_id = False
-        self.last_status = {}
+        # Last (status, filled, avg_price) printed per order, to skip repeated callbacks.
+        self._last_status_per_order = {}
+        # (order_id, status, filled, remaining, avg_price) per status change, oldest first.
+        self.status_events = deque(maxlen=4096)
+        self._status_changed = threading.Condition()
+        # Per-thread messages buffered by a @_batched_output method; ``lines`` is
+        # None when the current thread is not batching (callbacks run on the reader thread).
+        self._output_batch = threading.local()
+
+    def _log(self, message, *args):
+        """Print ``message % args``; formatting is skipped entirely when not verbose."""
+        if not self.verbose:
+            return
+        if args:
+            message = message % args
+        lines = getattr(self._output_batch, "lines", None)
+        if lines is None:
+            print(message)
+        else:
+            lines.append(message)
+
+    def _track_order(self, order_id, order_info):
+        self.active_orders[order_id] = order_info
+        self._update_open_index(order_id, order_info)
+
+    def _update_open_index(self, order_id, order_info):
+        if order_info.status in TERMINAL_ORDER_STATUSES:
+            self._open_orders.pop(order_id, None)
+        else:
+            self._open_orders[order_id] = order_info
 
     def set_next_order_id(self, order_id):
         self.next_order_id = order_id
         self.has_valid_id = True
-        print(f"[订单管理] 设置起始订单ID: {order_id}")
+        self._log("[订单管理] 设置起始订单ID: %s", order_id)
 
     def has_next_id(self):
         return self.has_valid_id
@@ -28,232 +181,229 @@ class OrderManager:
     def get_next_order_id(self):
         order_id = self.next_order_id
         self.next_order_id += 1
-        print(f"[订单管理] 分配订单ID: {order_id}")
+        self._log("[订单管理] 分配订单ID: %s", order_id)
         return order_id
 
+    @_batched_output
     def create_bracket_order(self, action, quantity, entry_price, stop_loss, take_profit=None):
-        parent_order = Order()
-        parent_order.orderId = self.get_next_order_id()
-        parent_order.action = action
-        parent_order.orderType = "LMT"
-        parent_order.totalQuantity = quantity
-        parent_order.lmtPrice = entry_price
-        parent_order.transmit = True
-
-        stop_order = Order()
-        stop_order.orderId = self.get_next_order_id()
-        stop_order.action = "SELL" if action == "BUY" else "BUY"
-        stop_order.orderType = "STP"
-        stop_order.totalQuantity = quantity
-        stop_order.auxPrice = stop_loss
-        stop_order.parentId = parent_order.orderId
-        stop_order.transmit = False if take_profit else True
-        stop_order.outsideRth = True
+        parent_order = _clone_order(
+            _LMT_TEMPLATE,
+            orderId=self.get_next_order_id(),
+            action=action,
+            totalQuantity=quantity,
+            lmtPrice=entry_price,
+        )
+
+        stop_order = _clone_order(
+            _STP_CHILD_TEMPLATE,
+            orderId=self.get_next_order_id(),
+            action="SELL" if action == "BUY" else "BUY",
+            totalQuantity=quantity,
+            auxPrice=stop_loss,
+            parentId=parent_order.orderId,
+            transmit=False if take_profit else True,
+        )
 
         orders = [parent_order, stop_order]
 
         if take_profit:
-            profit_order = Order()
-            profit_order.orderId = self.get_next_order_id()
-            profit_order.action = "SELL" if action == "BUY" else "BUY"
-            profit_order.orderType = "LMT"
-            profit_order.totalQuantity = quantity
-            profit_order.lmtPrice = take_profit
-            profit_order.parentId = parent_order.orderId
-            profit_order.transmit = True
-            profit_order.outsideRth = True
+            profit_order = _clone_order(
+                _LMT_CHILD_TEMPLATE,
+                orderId=self.get_next_order_id(),
+                action="SELL" if action == "BUY" else "BUY",
+                totalQuantity=quantity,
+                lmtPrice=take_profit,
+                parentId=parent_order.orderId,
+            )
 
             orders.append(profit_order)
 
         return orders
 
+    @_batched_output
     def place_bracket_order(self, contract: Contract, action, quantity, entry_price, stop_loss, take_profit=None):
         try:
-            parent_order = Order()
-            parent_order.orderId = self.get_next_order_id()
-            parent_order.action = action
-            parent_order.orderType = "MKT"
-            parent_order.totalQuantity = quantity
-            parent_order.tif = "DAY"
-            parent_order.transmit = True
-
-            parent_order.eTradeOnly = False
-            parent_order.firmQuoteOnly = False
-            parent_order.outsideRth = True
-
-            print(f"发送主订单(市价) - ID: {parent_order.orderId}, {action} {quantity} {contract.symbol}")
+            parent_order = self.create_market_order(action, quantity)
+
+            self._log("发送主订单(市价) - ID: %s, %s %s %s", parent_order.orderId, action, quantity, contract.symbol)
             self.client.placeOrder(parent_order.orderId, contract, parent_order)
 
             stop_order_id = None
             if action == "BUY":
-                stop_order = Order()
-                stop_order.orderId = self.get_next_order_id()
-                stop_order.action = "SELL"
-                stop_order.orderType = "STP"
-                stop_order.totalQuantity = quantity
-                stop_order.auxPrice = stop_loss
-                stop_order.parentId = parent_order.orderId
-                stop_order.tif = "GTC"
-                stop_order.transmit = True
-                stop_order.outsideRth = True
-
-                print(f"发送止损单 - ID: {stop_order.orderId}, 止损价: ${stop_loss:.2f}")
+                stop_order = _clone_order(
+                    _STP_GTC_TEMPLATE,
+                    orderId=self.get_next_order_id(),
+                    action="SELL",
+                    totalQuantity=quantity,
+                    auxPrice=stop_loss,
+                    parentId=parent_order.orderId,
+                )
+
+                self._log("发送止损单 - ID: %s, 止损价: $%.2f", stop_order.orderId, stop_loss)
                 self.client.placeOrder(stop_order.orderId, contract, stop_order)
                 stop_order_id = stop_order.orderId
 
-                stop_info = {
-                    "symbol": contract.symbol,
-                    "action": "SELL",
-                    "quantity": quantity,
-                    "stop_loss": stop_loss,
-                    "parent_id": parent_order.orderId,
-                    "order_type": "STOP",
-                    "status": "SUBMITTED",
-                    "timestamp": time.time(),
-                }
-                self.active_orders[stop_order.orderId] = stop_info
+                stop_info = OrderInfo(
+                    symbol=contract.symbol,
+                    action="SELL",
+                    quantity=quantity,
+                    order_type="STOP",
+                    status="SUBMITTED",
+                    timestamp=time.time(),
+                    stop_loss=stop_loss,
+                    parent_id=parent_order.orderId,
+                )
+                self._track_order(stop_order.orderId, stop_info)
             else:
-                print("ℹ️ 做空订单，不下自动止损单，仅依靠策略信号平仓")
-
-            order_info = {
-                "symbol": contract.symbol,
-                "action": action,
-                "quantity": quantity,
-                "entry_price": entry_price,
-                "stop_loss": stop_loss,
-                "take_profit": take_profit,
-                "parent_id": parent_order.orderId,
-                "stop_id": stop_order_id,
-                "status": "SUBMITTED" if action == "SELL" else "BRACKET_SUBMITTED",
-                "timestamp": time.time(),
-                "order_type": "PARENT",
-            }
-
-            self.active_orders[parent_order.orderId] = order_info
+                self._log("ℹ️ 做空订单，不下自动止损单，仅依靠策略信号平仓")
+
+            order_info = OrderInfo(
+                symbol=contract.symbol,
+                action=action,
+                quantity=quantity,
+                order_type="PARENT",
+                status="SUBMITTED" if action == "SELL" else "BRACKET_SUBMITTED",
+                timestamp=time.time(),
+                entry_price=entry_price,
+                stop_loss=stop_loss,
+                take_profit=take_profit,
+                parent_id=parent_order.orderId,
+                stop_id=stop_order_id,
+            )
+
+            self._track_order(parent_order.orderId, order_info)
 
             if action == "BUY":
-                print(f"[Order] 做多市价单已提交: 主单ID={parent_order.orderId}, 止损单ID={stop_order_id}")
+                self._log("[Order] 做多市价单已提交: 主单ID=%s, 止损单ID=%s", parent_order.orderId, stop_order_id)
             else:
-                print(f"[Order] 做空市价单已提交: 主单ID={parent_order.orderId} (无自动止损单)")
+                self._log("[Order] 做空市价单已提交: 主单ID=%s (无自动止损单)", parent_order.orderId)
 
-            return order_info
+            return order_info.to_dict()
 
         except Exception as exc:  # pragma: no cover - defensive logging
-            print(f"[Error] 市价Bracket订单下单失败: {exc}")
+            self._log("[Error] 市价Bracket订单下单失败: %s", exc)
             return None
 
     def create_market_order(self, action, quantity):
-        order = Order()
-        order.orderId = self.get_next_order_id()
-        order.action = action
-        order.orderType = "MKT"
-        order.totalQuantity = quantity
-        order.transmit = True
-        order.tif = "DAY"
-
-        order.eTradeOnly = False
-        order.firmQuoteOnly = False
-        order.outsideRth = True
-        return order
+        return _clone_order(
+            _MKT_TEMPLATE, orderId=self.get_next_order_id(), action=action, totalQuantity=quantity
+        )
 
+    @_batched_output
     def place_market_order(self, contract: Contract, action, quantity):
         try:
             order = self.create_market_order(action, quantity)
 
-            order_info = {
-                "symbol": contract.symbol,
-                "action": action,
-                "quantity": quantity,
-                "order_type": "MARKET",
-                "status": "SUBMITTED",
-                "timestamp": time.time(),
-            }
+            order_info = OrderInfo(
+                symbol=contract.symbol,
+                action=action,
+                quantity=quantity,
+                order_type="MARKET",
+                status="SUBMITTED",
+                timestamp=time.time(),
+            )
 
             self.client.placeOrder(order.orderId, contract, order)
-            self.active_orders[order.orderId] = order_info
+            self._track_order(order.orderId, order_info)
 
-            print(f"市价单已提交 - ID: {order.orderId}, {action} {quantity} {contract.symbol}")
-            return order_info
+            self._log("市价单已提交 - ID: %s, %s %s %s", order.orderId, action, quantity, contract.symbol)
+            return order_info.to_dict()
 
         except Exception as exc:  # pragma: no cover - defensive logging
-            print(f"市价单下单失败: {exc}")
+            self._log("市价单下单失败: %s", exc)
             return None
 
     def cancel_order(self, order_id):
         try:
             self.client.cancelOrder(order_id)
             if order_id in self.active_orders:
-                self.active_orders[order_id]["status"] = "CANCELLED"
-            print(f"订单取消请求已发送 - ID: {order_id}")
+                self.active_orders[order_id].status = "CANCELLED"
+                self._open_orders.pop(order_id, None)
+            self._log("订单取消请求已发送 - ID: %s", order_id)
         except Exception as exc:  # pragma: no cover - defensive logging
-            print(f"取消订单失败: {exc}")
+            self._log("取消订单失败: %s", exc)
 
+    @_batched_output
     def cancel_all_orders(self):
-        for order_id in list(self.active_orders.keys()):
-            if self.active_orders[order_id]["status"] not in ["FILLED", "CANCELLED"]:
-                self.cancel_order(order_id)
+        for order_id in list(self._open_orders):
+            self.cancel_order(order_id)
 
+    @_batched_output
     def orderStatus(self, orderId, status, filled, remaining, avgFillPrice, permId, parentId, lastFillPrice, clientId, whyHeld, mktCapPrice):
-        if orderId in self.active_orders:
-            self.active_orders[orderId]["status"] = status
-            self.active_orders[orderId]["filled"] = filled
-            self.active_orders[orderId]["remaining"] = remaining
-            self.active_orders[orderId]["avg_price"] = avgFillPrice
-
-            symbol = self.active_orders[orderId]["symbol"]
-
-            status_key = f"{orderId}_{status}_{filled}_{avgFillPrice}"
-            if status_key not in self.last_status:
-                self.last_status[status_key] = True
-
-                if status == "PreSubmitted":
-                    print(f"📤 [{symbol}] 订单 {orderId} 已提交，等待执行...")
-                elif status == "Submitted":
-                    print(f"⏳ [{symbol}] 订单 {orderId} 已确认，等待成交...")
-                elif status == "Filled":
-                    print(f"✅ [{symbol}] 订单 {orderId} 已成交！")
-                    print(f"   成交: {filled}股 @ ${avgFillPrice:.2f}")
-                elif status == "Cancelled":
-                    print(f"❌ [{symbol}] 订单 {orderId} 已取消")
-                elif status == "PendingCancel":
-                    print(f"🔄 [{symbol}] 订单 {orderId} 取消中...")
-                else:
-                    print(f"📊 [{symbol}] 订单 {orderId} 状态: {status}")
+        info = self.active_orders.get(orderId)
+        if info is None:
+            return
+
+        status = intern_field(status)
+        status_key = (status, filled, avgFillPrice)
+        already_reported = self._last_status_per_order.get(orderId) == status_key
+        if already_reported and info.status == status and info.remaining == remaining:
+            # Duplicate callback: the stored order already reflects it.
+            return
+
+        info.status = status
+        info.filled = filled
+        info.remaining = remaining
+        info.avg_price = avgFillPrice
+        self._update_open_index(orderId, info)
+        with self._status_changed:
+            self.status_events.append((orderId, status, filled, remaining, avgFillPrice))
+            self._status_changed.notify_all()
+
+        if not already_reported:
+            self._last_status_per_order[orderId] = status_key
+            if self.verbose:
+                template = _STATUS_MESSAGES.get(status, _DEFAULT_STATUS_MESSAGE)
+                self._log(
+                    template.format(
+                        symbol=info.symbol, order_id=orderId, status=status, filled=filled, avg_price=avgFillPrice
+                    )
+                )
 
     def openOrder(self, orderId, contract, order, orderState):
         if orderId not in self.active_orders:
-            self.active_orders[orderId] = {
-                "symbol": contract.symbol,
-                "action": order.action,
-                "quantity": order.totalQuantity,
-                "order_type": order.orderType,
-                "status": "OPEN",
-                "timestamp": time.time(),
-            }
+            self._track_order(
+                orderId,
+                OrderInfo(
+                    symbol=intern_field(contract.symbol),
+                    action=intern_field(order.action),
+                    quantity=order.totalQuantity,
+                    order_type=intern_field(order.orderType),
+                    status="OPEN",
+                    timestamp=time.time(),
+                ),
+            )
 
     def execDetails(self, reqId, contract, execution):
         order_id = execution.orderId
-        symbol = contract.symbol
+        symbol = intern_field(contract.symbol)
 
-        print(f"成交回报 - {symbol} 订单ID:{order_id} 价格:${execution.price} 数量:{execution.shares}")
+        self._log("成交回报 - %s 订单ID:%s 价格:$%s 数量:%s", symbol, order_id, execution.price, execution.shares)
 
-        if symbol not in self.positions:
-            self.positions[symbol] = {"position": 0, "avg_cost": 0}
+        sign = EXECUTION_SIDE_SIGN.get(execution.side)
+        if sign is None:
+            self._log("[订单管理] 未知成交方向: %s，忽略该成交回报", execution.side)
+            return
 
-        current_pos = self.positions[symbol]["position"]
-        if execution.side == "BOT":
-            new_position = current_pos + execution.shares
-        else:
-            new_position = current_pos - execution.shares
+        state = self.positions.get(symbol)
+        if state is None:
+            state = self.positions[symbol] = {"position": 0, "avg_cost": 0}
 
-        self.positions[symbol]["position"] = new_position
+        current_pos = state["position"]
+        state["position"] = current_pos + sign * execution.shares
+        state["avg_cost"] = rolled_average_cost(
+            float(current_pos), float(state["avg_cost"]), sign * float(execution.shares), float(execution.price)
+        )
 
     def get_positions(self):
         return self.positions.copy()
 
+    def next_status_event(self, timeout=None):
+        """Pop the oldest status change, waiting up to ``timeout`` seconds; None on timeout."""
+        with self._status_changed:
+            if not self._status_changed.wait_for(lambda: self.status_events, timeout):
+                return None
+            return self.status_events.popleft()
+
     def get_active_orders(self):
-        return {
-            k: v
-            for k, v in self.active_orders.items()
-            if v["status"] not in ["FILLED", "CANCELLED"]
-        }
+        return {order_id: info.to_dict() for order_id, info in self._open_orders.items()}
@@ -1,12 +1,97 @@
 #!/usr/bin/env python3
 """Portfolio tracking utilities built atop the shared IBKR connection."""
 
-import math
+import datetime
+import threading
+import time
 from collections import defaultdict
 
+import numpy as np
 import pandas as pd
 
-from .ibkr_connection import IBKRConnection
+from .ibkr_connection import EXECUTION_SIDE_SIGN, IBKRConnection, intern_field, rolled_average_cost
+
+
+PORTFOLIO_FIELDS = (
+    "symbol",
+    "secType",
+    "currency",
+    "exchange",
+    "position",
+    "marketPrice",
+    "marketValue",
+    "averageCost",
+    "unrealizedPNL",
+    "realizedPNL",
+    "accountName",
+)
+POSITION_FIELDS = ("account", "symbol", "secType", "currency", "exchange", "position", "avgCost")
+PORTFOLIO_NUMERIC_FIELDS = frozenset(
+    {"position", "marketPrice", "marketValue", "averageCost", "unrealizedPNL", "realizedPNL"}
+)
+POSITION_NUMERIC_FIELDS = frozenset({"position", "avgCost"})
+
+try:
+    from zoneinfo import ZoneInfo
+except ImportError:  # pragma: no cover - fallback for older Python
+    ZoneInfo = None
+
+
+def _execution_timestamp(exec_time):
+    """Epoch seconds of an IBKR ``Execution.time`` ("20240304  10:01:30 US/Eastern"), or None."""
+    parts = exec_time.split() if exec_time else ()
+    if len(parts) < 2:
+        return None
+    try:
+        when = datetime.datetime.strptime(f"{parts[0]} {parts[1]}", "%Y%m%d %H:%M:%S")
+        if len(parts) > 2 and ZoneInfo is not None:
+            when = when.replace(tzinfo=ZoneInfo(parts[2]))
+        return when.timestamp()
+    except (ValueError, KeyError):
+        return None
+
+
+class _RowBuffer:
+    """Append-only store for IBKR callback rows, transposed into columns on read.
+
+    Each callback adds one tuple with a single ``list.append``, so readers on
+    other threads always see whole rows; they work from a sliced snapshot.
+    """
+
+    __slots__ = ("fields", "rows", "_numeric")
+
+    def __init__(self, fields, numeric=frozenset()):
+        self.fields = tuple(fields)
+        self.rows = []
+        self._numeric = numeric
+
+    def append(self, *values):
+        self.rows.append(values)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def columns(self):
+        """Snapshot of the rows received so far as ``{field: [values]}``."""
+        rows = self.rows[:]
+        if not rows:
+            return {field: [] for field in self.fields}
+        return dict(zip(self.fields, map(list, zip(*rows))))
+
+    def to_frame(self, columns=None):
+        if columns is None:
+            columns = self.columns()
+        # Numeric columns are built as float64 directly instead of being inferred.
+        return pd.DataFrame(
+            {
+                field: np.array(values, dtype=np.float64) if field in self._numeric else values
+                for field, values in columns.items()
+            }
+        )
+
+    def records(self):
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in self.rows[:]]
 
 
 class PortfolioTracker(IBKRConnection):
@@ -14,12 +99,34 @@ class PortfolioTracker(IBKRConnection):
 
     def __init__(self, client_id: int = 1):
         super().__init__(client_id)
-        self.portfolio_items = []
+        self._portfolio_rows = _RowBuffer(PORTFOLIO_FIELDS, PORTFOLIO_NUMERIC_FIELDS)
         self.account_values = defaultdict(dict)
-        self.positions = []
+        self._position_rows = _RowBuffer(POSITION_FIELDS, POSITION_NUMERIC_FIELDS)
+        # Latest position per (account, symbol, currency), seeded by position()
+        # and rolled forward by execDetails. Entries are replaced, never mutated.
+        self._live_positions = {}
+        # When position() last reported each key; older executions are already included.
+        self._position_times = {}
+        # execIds already applied, so resent executions are not counted twice.
+        self._seen_exec_ids = set()
+        # (data version, frame) pairs reused until another callback row arrives.
+        self._positions_df_cache = None
+        self._portfolio_df_cache = None
         self.portfolio_downloaded = False
         self.account_downloaded = False
         self.positions_downloaded = False
+        # Set by the download-end callbacks once account and positions are in.
+        self._data_ready = threading.Event()
+
+    @property
+    def portfolio_items(self):
+        """Portfolio rows received so far, as one dict per updatePortfolio callback."""
+        return self._portfolio_rows.records()
+
+    @property
+    def positions(self):
+        """Position rows received so far, as one dict per position callback."""
+        return self._position_rows.records()
 
     def on_connection_established(self):
         print("Requesting account and position data...")
@@ -27,20 +134,18 @@ class PortfolioTracker(IBKRConnection):
         self.reqPositions()
 
     def updatePortfolio(self, contract, position, marketPrice, marketValue, averageCost, unrealizedPNL, realizedPNL, accountName):
-        self.portfolio_items.append(
-            {
-                "symbol": contract.symbol,
-                "secType": contract.secType,
-                "currency": contract.currency,
-                "exchange": contract.exchange,
-                "position": position,
-                "marketPrice": marketPrice,
-                "marketValue": marketValue,
-                "averageCost": averageCost,
-                "unrealizedPNL": unrealizedPNL,
-                "realizedPNL": realizedPNL,
-                "accountName": accountName,
-            }
+        self._portfolio_rows.append(
+            intern_field(contract.symbol),
+            intern_field(contract.secType),
+            intern_field(contract.currency),
+            intern_field(contract.exchange),
+            position,
+            marketPrice,
+            marketValue,
+            averageCost,
+            unrealizedPNL,
+            realizedPNL,
+            intern_field(accountName),
         )
 
     def updateAccountValue(self, key, val, currency, accountName):
@@ -49,27 +154,80 @@ class PortfolioTracker(IBKRConnection):
     def accountDownloadEnd(self, accountName):
         print(f"Account {accountName} data download completed")
         self.account_downloaded = True
+        self._signal_if_ready()
 
     def portfolioDownloadEnd(self):
         print("Portfolio data download completed")
         self.portfolio_downloaded = True
 
     def position(self, account, contract, position, avgCost):
-        self.positions.append(
-            {
-                "account": account,
-                "symbol": contract.symbol,
-                "secType": contract.secType,
-                "currency": contract.currency,
-                "exchange": contract.exchange,
-                "position": position,
-                "avgCost": avgCost,
-            }
+        self._position_rows.append(
+            intern_field(account),
+            intern_field(contract.symbol),
+            intern_field(contract.secType),
+            intern_field(contract.currency),
+            intern_field(contract.exchange),
+            position,
+            avgCost,
         )
+        key = (account, contract.symbol, contract.currency)
+        self._position_times[key] = time.time()
+        self._live_positions[key] = {
+            "account": intern_field(account),
+            "symbol": intern_field(contract.symbol),
+            "secType": intern_field(contract.secType),
+            "currency": intern_field(contract.currency),
+            "exchange": intern_field(contract.exchange),
+            "position": position,
+            "avgCost": avgCost,
+        }
+
+    def execDetails(self, reqId, contract, execution):
+        sign = EXECUTION_SIDE_SIGN.get(execution.side)
+        if sign is None:
+            print(f"Ignoring execution with unknown side: {execution.side}")
+            return
+
+        # IBKR resends executions on reconnect, reqExecutions and corrections.
+        exec_id = execution.execId
+        if exec_id:
+            if exec_id in self._seen_exec_ids:
+                return
+            self._seen_exec_ids.add(exec_id)
+
+        key = (execution.acctNumber, contract.symbol, contract.currency)
+        # position() is authoritative: a fill it has already reported must not be added again.
+        position_time = self._position_times.get(key)
+        if position_time is not None:
+            executed_at = _execution_timestamp(execution.time)
+            if executed_at is not None and executed_at <= position_time:
+                return
+
+        previous = self._live_positions.get(key)
+        held = float(previous["position"]) if previous else 0.0
+        avg_cost = float(previous["avgCost"]) if previous else 0.0
+        traded = sign * float(execution.shares)
+        new_position = held + traded
+        avg_cost = rolled_average_cost(held, avg_cost, traded, float(execution.price))
+
+        self._live_positions[key] = {
+            "account": intern_field(execution.acctNumber),
+            "symbol": intern_field(contract.symbol),
+            "secType": intern_field(contract.secType),
+            "currency": intern_field(contract.currency),
+            "exchange": intern_field(contract.exchange),
+            "position": new_position,
+            "avgCost": avg_cost,
+        }
 
     def positionEnd(self):
         print("Position data download completed")
         self.positions_downloaded = True
+        self._signal_if_ready()
+
+    def _signal_if_ready(self):
+        if self.account_downloaded and self.positions_downloaded:
+            self._data_ready.set()
 
     def get_cash_balances(self):
         cash_balances = {}
@@ -78,15 +236,34 @@ class PortfolioTracker(IBKRConnection):
                 cash_balances[key] = self.account_values[key]
         return cash_balances
 
-    def get_positions_df(self):
-        if not self.positions:
+    def _data_version(self):
+        # The callback buffers are append-only, so their sizes identify the data.
+        return len(self._position_rows), len(self._portfolio_rows)
+
+    def get_positions_df(self, live: bool = False):
+        """Positions merged with portfolio data.
+
+        With ``live=True`` return just the position columns, kept current from
+        execution callbacks, without waiting for IBKR to resend positions.
+        """
+        if live and self._live_positions:
+            return pd.DataFrame.from_records(list(self._live_positions.values()), columns=POSITION_FIELDS)
+        version = self._data_version()
+        if self._positions_df_cache is None or self._positions_df_cache[0] != version:
+            self._positions_df_cache = (version, self._build_positions_df())
+        return self._positions_df_cache[1].copy()
+
+    def _build_positions_df(self):
+        if not self._position_rows:
             return pd.DataFrame()
 
-        positions_df = pd.DataFrame(self.positions)
-        positions_df["position"] = pd.to_numeric(positions_df.get("position"), errors="coerce").fillna(0.0)
-        positions_df["avgCost"] = pd.to_numeric(positions_df.get("avgCost"), errors="coerce").fillna(0.0)
+        # Take one snapshot per buffer so the frame and the join see the same rows.
+        positions = self._position_rows.columns()
+        positions_df = self._position_rows.to_frame(positions)
+        positions_df["position"] = positions_df["position"].fillna(0.0)
+        positions_df["avgCost"] = positions_df["avgCost"].fillna(0.0)
 
-        if not self.portfolio_items:
+        if not self._portfolio_rows:
             positions_df["marketValue"] = positions_df["position"] * positions_df["avgCost"].fillna(0.0)
             positions_df["marketPrice"] = positions_df["avgCost"].fillna(0.0)
             positions_df["realizedPnl"] = 0.0
@@ -95,127 +272,155 @@ class PortfolioTracker(IBKRConnection):
             positions_df["unrealizedPnlRatio"] = 0.0
             return positions_df
 
-        portfolio_df = pd.DataFrame(self.portfolio_items)
-        numeric_cols = ["marketPrice", "marketValue", "averageCost", "unrealizedPNL", "realizedPNL"]
-        for column in numeric_cols:
-            if column in portfolio_df:
-                portfolio_df[column] = pd.to_numeric(portfolio_df[column], errors="coerce")
-
-        merged = positions_df.merge(
-            portfolio_df[
-                [
-                    "accountName",
-                    "symbol",
-                    "currency",
-                    "marketPrice",
-                    "marketValue",
-                    "averageCost",
-                    "unrealizedPNL",
-                    "realizedPNL",
-                ]
-            ],
-            left_on=["account", "symbol", "currency"],
-            right_on=["accountName", "symbol", "currency"],
-            how="left",
+        # Left-join each position to the latest portfolio row for its account/symbol/currency.
+        portfolio = self._portfolio_rows.columns()
+        row_for_key = {
+            key: row
+            for row, key in enumerate(zip(portfolio["accountName"], portfolio["symbol"], portfolio["currency"]))
+        }
+        rows = np.fromiter(
+            (row_for_key.get(key, -1) for key in zip(positions["account"], positions["symbol"], positions["currency"])),
+            dtype=np.intp,
+            count=len(positions_df),
         )
-
-        merged["averageCost"] = merged["averageCost"].combine_first(merged["avgCost"])
-        merged["averageCost"] = merged["averageCost"].fillna(0.0)
-        merged["marketPrice"] = merged["marketPrice"].combine_first(merged["averageCost"])
-        merged["marketValue"] = merged["marketValue"].fillna(merged["position"] * merged["marketPrice"].fillna(0.0))
-        merged["unrealizedPNL"] = merged["unrealizedPNL"].fillna(
-            merged["marketValue"] - merged["position"] * merged["averageCost"].fillna(0.0)
+        matched = rows >= 0
+
+        def joined(column):
+            values = pd.to_numeric(pd.Series(portfolio[column]), errors="coerce").to_numpy(dtype=np.float64)
+            out = np.full(len(rows), np.nan)
+            out[matched] = values[rows[matched]]
+            return out
+
+        average_cost = joined("averageCost")
+        market_price = joined("marketPrice")
+        market_value = joined("marketValue")
+        unrealized = joined("unrealizedPNL")
+        realized = joined("realizedPNL")
+        avg_cost = positions_df["avgCost"].to_numpy(dtype=np.float64)
+        position = positions_df["position"].to_numpy(dtype=np.float64)
+
+        average_cost = np.nan_to_num(np.where(np.isnan(average_cost), avg_cost, average_cost))
+        market_price = np.where(np.isnan(market_price), average_cost, market_price)
+        market_value = np.where(np.isnan(market_value), position * market_price, market_value)
+        unrealized = np.where(np.isnan(unrealized), market_value - position * average_cost, unrealized)
+        realized = np.nan_to_num(realized)
+
+        unrealized_filled = np.nan_to_num(unrealized)
+        cost_basis = np.abs(average_cost * position)
+        non_zero = cost_basis != 0
+        ratio = np.zeros_like(cost_basis)
+        np.divide(unrealized_filled, cost_basis, out=ratio, where=non_zero)
+
+        return positions_df.assign(
+            marketPrice=market_price,
+            marketValue=market_value,
+            averageCost=average_cost,
+            unrealizedPnl=unrealized,
+            realizedPnl=realized,
+            dailyPnl=realized + unrealized_filled,
+            unrealizedPnlRatio=ratio,
         )
-        merged["realizedPNL"] = merged["realizedPNL"].fillna(0.0)
-
-        realized = merged["realizedPNL"].fillna(0.0)
-        unrealized = merged["unrealizedPNL"].fillna(0.0)
-        merged["dailyPnl"] = realized + unrealized
-
-        cost_basis = (merged["averageCost"].fillna(0.0) * merged["position"]).abs()
-        merged["unrealizedPnlRatio"] = 0.0
-        non_zero_mask = cost_basis != 0
-        merged.loc[non_zero_mask, "unrealizedPnlRatio"] = unrealized[non_zero_mask] / cost_basis[non_zero_mask]
-
-        merged = merged.drop(columns=[col for col in ["accountName"] if col in merged], errors="ignore")
-        merged = merged.rename(columns={"unrealizedPNL": "unrealizedPnl", "realizedPNL": "realizedPnl"})
-
-        return merged
 
     def get_portfolio_df(self):
-        if not self.portfolio_items:
+        if not self._portfolio_rows:
             return pd.DataFrame()
-        return pd.DataFrame(self.portfolio_items)
+        version = self._data_version()
+        if self._portfolio_df_cache is None or self._portfolio_df_cache[0] != version:
+            self._portfolio_df_cache = (version, self._portfolio_rows.to_frame())
+        return self._portfolio_df_cache[1].copy()
 
-    def get_portfolio_summary(self):
-        print("\n" + "=" * 60)
-        print("IBKR PAPER TRADING PORTFOLIO SUMMARY")
-        print("=" * 60)
+    @staticmethod
+    def market_value_by_currency(portfolio_df):
+        """Return ``(currency, total market value)`` pairs sorted by currency."""
+        codes, currencies = pd.factorize(portfolio_df["currency"], sort=True)
+        known = codes >= 0
+        market_values = pd.to_numeric(portfolio_df["marketValue"], errors="coerce").fillna(0.0).to_numpy()
+        totals = np.bincount(codes[known], weights=market_values[known], minlength=len(currencies))
+        return list(zip(currencies.tolist(), totals.tolist()))
 
-        print("\nCash Balances:")
-        print("-" * 30)
+    def get_portfolio_summary(self):
+        # Assemble the whole report and write it with a single print.
+        out = []
+        out.append("\n" + "=" * 60)
+        out.append("IBKR PAPER TRADING PORTFOLIO SUMMARY")
+        out.append("=" * 60)
+
+        out.append("\nCash Balances:")
+        out.append("-" * 30)
         cash_balances = self.get_cash_balances()
         if cash_balances:
             for key, currencies in cash_balances.items():
-                print(f"\n{key}:")
+                out.append(f"\n{key}:")
                 for currency, info in currencies.items():
-                    print(f"  {currency}: {info['value']}")
+                    out.append(f"  {currency}: {info['value']}")
         else:
-            print("No cash balance data available")
+            out.append("No cash balance data available")
 
-        if self.positions:
-            print("\nCurrent Positions:")
-            print("-" * 30)
+        if self._position_rows:
+            out.append("\nCurrent Positions:")
+            out.append("-" * 30)
             positions_df = self.get_positions_df()
-            for _, pos in positions_df.iterrows():
-                position_size = self._to_float(pos.get("position"))
+            cost_column = "averageCost" if "averageCost" in positions_df else "avgCost"
+            numeric_columns = [
+                "position",
+                cost_column,
+                "marketValue",
+                "dailyPnl",
+                "unrealizedPnl",
+                "unrealizedPnlRatio",
+            ]
+            # Coerce each numeric column once; unparseable or missing values read as 0.
+            numeric = [
+                pd.to_numeric(positions_df[column], errors="coerce").fillna(0.0).to_numpy(dtype=np.float64).tolist()
+                for column in numeric_columns
+            ]
+            rows = zip(positions_df["symbol"].tolist(), positions_df["currency"].tolist(), *numeric)
+            for symbol, currency, position_size, avg_cost, market_value, daily_pnl, unrealized_pnl, ratio in rows:
                 if position_size != 0:
-                    market_value = self._to_float(pos.get("marketValue"))
-                    daily_pnl = self._to_float(pos.get("dailyPnl"))
-                    unrealized_pnl = self._to_float(pos.get("unrealizedPnl"))
-                    ratio_pct = self._to_float(pos.get("unrealizedPnlRatio")) * 100
-                    avg_cost = self._to_float(pos.get("averageCost", pos.get("avgCost")))
-                    currency = pos.get("currency") or "N/A"
-                    symbol = pos.get("symbol") or "UNKNOWN"
-                    print(
-                        f"{symbol} ({currency}): {position_size} shares, Avg Cost: {avg_cost:.2f}, "
-                        f"Market Value: {market_value:.2f}, Daily P&L: {daily_pnl:.2f}, "
-                        f"Unrealized P&L: {unrealized_pnl:.2f} ({ratio_pct:.2f}%)"
+                    out.append(
+                        f"{symbol or 'UNKNOWN'} ({currency or 'N/A'}): {position_size} shares, "
+                        f"Avg Cost: {avg_cost:.2f}, "
+                        f"Market Value: {market_value:.2f}, "
+                        f"Daily P&L: {daily_pnl:.2f}, "
+                        f"Unrealized P&L: {unrealized_pnl:.2f} "
+                        f"({ratio * 100:.2f}%)"
                     )
         else:
-            print("\nNo current positions")
+            out.append("\nNo current positions")
 
-        if self.portfolio_items:
-            print("\nPortfolio Details:")
-            print("-" * 30)
+        if self._portfolio_rows:
+            out.append("\nPortfolio Details:")
+            out.append("-" * 30)
             portfolio_df = self.get_portfolio_df()
-            currency_summary = portfolio_df.groupby("currency")["marketValue"].sum()
-            print("\nMarket Value by Currency:")
-            for currency, value in currency_summary.items():
-                print(f"  {currency}: {value:.2f}")
-
-            print("\nDetailed Holdings:")
-            for _, item in portfolio_df.iterrows():
-                if float(item["position"]) != 0:
-                    print(
-                        f"  {item['symbol']} ({item['currency']}): Position {item['position']}, "
-                        f"Market Value {item['marketValue']:.2f}, "
-                        f"Unrealized P&L {item['unrealizedPNL']:.2f}"
-                    )
+            out.append("\nMarket Value by Currency:")
+            for currency, value in self.market_value_by_currency(portfolio_df):
+                out.append(f"  {currency}: {value:.2f}")
+
+            out.append("\nDetailed Holdings:")
+            rows = portfolio_df[["symbol", "currency", "position", "marketValue", "unrealizedPNL"]].itertuples(
+                index=False, name=None
+            )
+            out.extend(
+                f"  {symbol} ({currency}): Position {position}, "
+                f"Market Value {market_value:.2f}, "
+                f"Unrealized P&L {unrealized_pnl:.2f}"
+                for symbol, currency, position, market_value, unrealized_pnl in rows
+                if float(position) != 0
+            )
         else:
-            print("\nNo portfolio items")
+            out.append("\nNo portfolio items")
 
-        print("\n" + "=" * 60)
+        out.append("\n" + "=" * 60)
+        print("\n".join(out))
 
     def fetch_portfolio_data(self, timeout: int = 30) -> bool:
         if not self.is_connected():
             print("Not connected to TWS")
             return False
 
-        def data_complete():
-            return self.account_downloaded and self.positions_downloaded
-
-        success = self.wait_for_completion(data_complete, timeout)
+        success = self._data_ready.wait(timeout)
+        if not success:
+            print(f"Operation timeout after {timeout} seconds")
 
         if success:
             print("Portfolio data fetch completed")
@@ -224,16 +429,6 @@ class PortfolioTracker(IBKRConnection):
 
         return success
 
-    @staticmethod
-    def _to_float(value, default: float = 0.0) -> float:
-        try:
-            result = float(value)
-            if math.isnan(result):
-                return default
-            return result
-        except (TypeError, ValueError):
-            return default
-
 
 def main():
     print("IBKR Portfolio Tracker")
@@ -1,12 +1,55 @@
 #!/usr/bin/env python3
 """Risk and position sizing utilities."""
 
-import math
+from math import floor
+
+import numpy as np
+
+
+# Direction of the stop relative to the entry price for each order action.
+_STOP_SIDE = {"BUY": -1, "SELL": 1}
+
+
+def _account_figures(account_info):
+    """Return ``(net liquidation, available funds, buying power)``; missing or empty values read as 0."""
+    get = account_info.get
+    return get("NetLiquidation") or 0, get("AvailableFunds") or 0, get("BuyingPower") or 0
+
+
+def _rejected(reason, details=None):
+    """Result for a signal that cannot be sized."""
+    result = {"quantity": 0, "risk_amount": 0, "position_value": 0, "valid": False, "reason": reason}
+    if details is not None:
+        result["details"] = details
+    return result
+
+
+class _ReadOnlyResult(dict):
+    """Shared result dict; still a dict so decision logs can JSON-encode it."""
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("shared risk manager results are read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        # Copies and pickles come back as ordinary dicts.
+        return dict, (dict(self),)
+
+
+# Rejections without per-call details are built once and shared.
+_MISSING_PRICES = _ReadOnlyResult(_rejected("Missing entry or stop loss price"))
+_INVALID_STOP = _ReadOnlyResult(_rejected("Invalid stop loss price"))
+_INVALID_NET_LIQUIDATION = _ReadOnlyResult(_rejected("Net liquidation value is invalid"))
+_RISK_CHECK_PASSED = _ReadOnlyResult({"valid": True, "reason": "Risk check passed"})
 
 
 class RiskManager:
     """Provide position sizing and risk validation helpers."""
 
+    __slots__ = ("max_risk_per_trade", "max_position_ratio")
+
     def __init__(self, max_risk_per_trade: float = 0.02, max_position_ratio: float = 0.20):
         self.max_risk_per_trade = max_risk_per_trade
         self.max_position_ratio = max_position_ratio
@@ -16,83 +59,44 @@ class RiskManager:
         stop_loss = signal["stop_loss"]
 
         if not entry_price or not stop_loss:
-            return {
-                "quantity": 0,
-                "risk_amount": 0,
-                "position_value": 0,
-                "valid": False,
-                "reason": "Missing entry or stop loss price",
-            }
+            return _MISSING_PRICES
 
         risk_per_share = abs(entry_price - stop_loss)
         if risk_per_share <= 0:
-            return {
-                "quantity": 0,
-                "risk_amount": 0,
-                "position_value": 0,
-                "valid": False,
-                "reason": "Invalid stop loss price",
-            }
+            return _INVALID_STOP
 
-        net_liquidation = account_info.get("NetLiquidation", 0)
+        net_liquidation, available_funds, buying_power = _account_figures(account_info)
         if net_liquidation <= 0:
-            return {
-                "quantity": 0,
-                "risk_amount": 0,
-                "position_value": 0,
-                "valid": False,
-                "reason": "Net liquidation value is invalid",
-            }
-
-        max_risk_amount = net_liquidation * self.max_risk_per_trade
-        qty_risk = math.floor(max_risk_amount / risk_per_share)
+            return _INVALID_NET_LIQUIDATION
 
-        available_funds = account_info.get("AvailableFunds", 0)
-        buying_power = account_info.get("BuyingPower", 0)
         usable_funds = min(available_funds, buying_power)
         if usable_funds <= 0:
-            return {
-                "quantity": 0,
-                "risk_amount": 0,
-                "position_value": 0,
-                "valid": False,
-                "reason": f"Insufficient capital: available ${available_funds:.2f}, buying power ${buying_power:.2f}",
-                "details": {"available_funds": available_funds, "buying_power": buying_power},
-            }
-
-        qty_cash = math.floor(usable_funds / entry_price)
+            return _rejected(
+                f"Insufficient capital: available ${available_funds:.2f}, buying power ${buying_power:.2f}",
+                {"available_funds": available_funds, "buying_power": buying_power},
+            )
 
+        max_risk_amount = net_liquidation * self.max_risk_per_trade
         max_position_value = net_liquidation * self.max_position_ratio
-        qty_position_ratio = math.floor(max_position_value / entry_price)
+        qty_risk = floor(max_risk_amount / risk_per_share)
+        qty_cash = floor(usable_funds / entry_price)
+        qty_position_ratio = floor(max_position_value / entry_price)
 
+        # Always at least one share; the caps below still reject it if unaffordable.
         final_quantity = max(1, min(qty_risk, qty_cash, qty_position_ratio))
-
-        if final_quantity <= 0:
-            return {
-                "quantity": 0,
-                "risk_amount": 0,
-                "position_value": 0,
-                "valid": False,
-                "reason": "Calculated position size is zero",
-            }
-
         actual_risk = final_quantity * risk_per_share
         position_value = final_quantity * entry_price
 
         if position_value > usable_funds:
-            return {
-                "quantity": 0,
-                "risk_amount": 0,
-                "position_value": 0,
-                "valid": False,
-                "reason": f"Required capital ${position_value:.2f} exceeds available funds ${usable_funds:.2f}",
-                "details": {
+            return _rejected(
+                f"Required capital ${position_value:.2f} exceeds available funds ${usable_funds:.2f}",
+                {
                     "required_funds": position_value,
                     "available_funds": usable_funds,
                     "entry_price": entry_price,
                     "quantity": final_quantity,
                 },
-            }
+            )
 
         return {
             "quantity": final_quantity,
@@ -114,19 +118,52 @@ class RiskManager:
             },
         }
 
+    def calculate_position_sizes(self, account_info, entry_prices, stop_losses):
+        """Size many signals against one account in a single numpy pass.
+
+        Applies the same rules as :meth:`calculate_position_size` and returns
+        ``quantity``, ``risk_amount``, ``position_value`` and ``valid`` arrays;
+        rejected signals get zeros.
+        """
+        entry = np.asarray(entry_prices, dtype=np.float64)
+        stop = np.asarray(stop_losses, dtype=np.float64)
+        risk_per_share = np.abs(entry - stop)
+        valid = (entry != 0) & (stop != 0) & ~np.isnan(entry) & ~np.isnan(stop) & (risk_per_share > 0)
+
+        net_liquidation, available_funds, buying_power = _account_figures(account_info)
+        usable_funds = min(available_funds, buying_power)
+        if net_liquidation <= 0 or usable_funds <= 0:
+            valid[:] = False
+
+        safe_entry = np.where(valid, entry, 1.0)
+        with np.errstate(over="ignore", invalid="ignore"):
+            qty_risk = np.floor(net_liquidation * self.max_risk_per_trade / np.where(valid, risk_per_share, 1.0))
+            qty_cash = np.floor(usable_funds / safe_entry)
+            qty_position_ratio = np.floor(net_liquidation * self.max_position_ratio / safe_entry)
+            quantity = np.maximum(1.0, np.minimum(np.minimum(qty_risk, qty_cash), qty_position_ratio))
+        position_value = quantity * safe_entry
+        valid &= position_value <= usable_funds
+
+        quantity = np.where(valid, quantity, 0.0).astype(np.int64)
+        return {
+            "quantity": quantity,
+            "risk_amount": np.where(valid, quantity * risk_per_share, 0.0),
+            "position_value": np.where(valid, position_value, 0.0),
+            "valid": valid,
+        }
+
     def validate_trade(self, account_info, signal, position_calc):
-        risk_ratio = position_calc["risk_amount"] / account_info["NetLiquidation"]
-        if risk_ratio > self.max_risk_per_trade * 1.1:
+        net_liquidation = account_info["NetLiquidation"]
+        risk_amount = position_calc["risk_amount"]
+        # Compare against the scaled limit; the ratio is only needed for the message.
+        if risk_amount > self.max_risk_per_trade * 1.1 * net_liquidation:
             return {
                 "valid": False,
-                "reason": f"Risk ratio {risk_ratio:.3f} exceeds limit {self.max_risk_per_trade:.3f}",
+                "reason": f"Risk ratio {risk_amount / net_liquidation:.3f} exceeds limit {self.max_risk_per_trade:.3f}",
             }
 
-        return {"valid": True, "reason": "Risk check passed"}
+        return _RISK_CHECK_PASSED
 
     def get_stop_loss_price(self, entry_price, action, stop_loss_pct: float = 0.03):
-        if action == "BUY":
-            return entry_price * (1 - stop_loss_pct)
-        if action == "SELL":
-            return entry_price * (1 + stop_loss_pct)
-        return entry_price
+        # Longs stop below the entry, shorts above; other actions keep the entry price.
+        return entry_price * (1 + _STOP_SIDE.get(action, 0) * stop_loss_pct)
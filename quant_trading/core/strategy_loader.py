@@ -4,29 +4,43 @@
 from __future__ import annotations
 
 import os
+import re
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Mapping, Optional, Tuple
 
 from quant_trading.config.strategy_defaults import STRATEGY_DEFAULT_CONFIGS
-from quant_trading.strategies import BaseStrategy, get_strategy_class, STRATEGY_REGISTRY
+from quant_trading.strategies import BaseStrategy, get_strategy_class, strategy_names
 
 DEFAULT_STRATEGY_NAME = "MACD"
 ENV_FILE = Path(__file__).resolve().parents[2] / "strategy.env"
 
+# One ``KEY=VALUE`` assignment per line, scanned over the raw bytes. Line breaks are the
+# ASCII ones str.splitlines() honours; blank, comment and ``=``-less lines never match.
+_ENV_LINE_RE = re.compile(
+    rb"(?:\A|(?<=[\n\r\v\f\x1c-\x1e]))[ \t]*([^\s#=\x1c-\x1e][^=\n\r\v\f\x1c-\x1e]*?)[ \t]*="
+    rb"[ \t]*([^\n\r\v\f\x1c-\x1e]*?)[ \t]*(?=[\n\r\v\f\x1c-\x1e]|\Z)"
+)
+
 
 def _parse_env_file(path: Path) -> Dict[str, str]:
+    """Parse ``KEY=VALUE`` lines, reusing the last parse while the file is unchanged."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return {}
+    return dict(_read_env_file(os.fspath(path), stat.st_mtime_ns, stat.st_size))
+
+
+@lru_cache(maxsize=4)
+def _read_env_file(path: str, mtime_ns: int, size: int) -> Dict[str, str]:
     env: Dict[str, str] = {}
-    if not path.exists():
-        return env
-
-    for raw_line in path.read_text(encoding="utf-8").splitlines():
-        line = raw_line.strip()
-        if not line or line.startswith("#"):
-            continue
-        if "=" not in line:
-            continue
-        key, value = line.split("=", 1)
-        env[key.strip()] = value.strip()
+    # Only matched keys and values are decoded; strip() also trims non-ASCII whitespace.
+    for raw_key, raw_value in _ENV_LINE_RE.findall(Path(path).read_bytes()):
+        key = raw_key.decode("utf-8").strip()
+        # Lines that only start with '#' after Unicode whitespace are still comments.
+        if key and not key.startswith("#"):
+            env[key] = raw_value.decode("utf-8").strip()
     return env
 
 
@@ -43,15 +57,22 @@ def get_active_strategy_name(default: str = DEFAULT_STRATEGY_NAME, file_env: Opt
     return default
 
 
-def _extract_strategy_config(strategy_name: str, env_map: Dict[str, str]) -> Dict[str, str]:
+def _extract_strategy_config(strategy_name: str, *env_maps: Mapping[str, str]) -> Dict[str, str]:
+    """Collect ``<NAME>_*`` settings (prefix matched case-insensitively); later maps win."""
     config: Dict[str, str] = {}
     prefix = f"{strategy_name.upper()}_"
-
-    for key, value in env_map.items():
-        upper_key = key.upper()
-        if upper_key.startswith(prefix):
-            config_key = upper_key[len(prefix):]
-            config[config_key] = value
+    prefix_len = len(prefix)
+    # Cheap first-character check so unrelated keys are never upper-cased.
+    initials = {prefix[0], prefix[0].lower()}
+
+    for env_map in env_maps:
+        # Iterate keys only: os.environ decodes a value only when it is fetched.
+        for key in env_map:
+            if key[:1] not in initials:
+                continue
+            upper_key = key.upper()
+            if upper_key.startswith(prefix):
+                config[upper_key[prefix_len:]] = env_map[key]
 
     return config
 
@@ -67,15 +88,15 @@ def load_strategy(strategy_name: Optional[str] = None) -> Tuple[str, BaseStrateg
         )
 
     config: Dict[str, str] = dict(STRATEGY_DEFAULT_CONFIGS.get(selected_name.upper(), {}))
-    config.update(_extract_strategy_config(selected_name, file_env))
-    config.update(_extract_strategy_config(selected_name, dict(os.environ)))
+    config.update(_extract_strategy_config(selected_name, file_env, os.environ))
 
     strategy_instance = strategy_cls()
-    if hasattr(strategy_instance, "configure"):
-        strategy_instance.configure(config)
+    configure = getattr(strategy_instance, "configure", None)
+    if config and configure is not None:
+        configure(config)
 
     return selected_name, strategy_instance, config
 
 
-def get_strategy_class_name_list() -> List[str]:
-    return list(STRATEGY_REGISTRY.keys())
+def get_strategy_class_name_list() -> Tuple[str, ...]:
+    return strategy_names()
@@ -15,7 +15,11 @@ from trading_logs.trading_journal import TradingJournal
 import time
 import datetime
 import csv
+import json
 import os
+import queue
+import threading
+from collections import Counter
 from pathlib import Path
 from typing import Dict
 
@@ -27,12 +31,55 @@ except ImportError:  # pragma: no cover - fallback for older Python
 
 BASE_TIMEFRAMES = [1, 3, 5, 10]  # 单位：分钟
 DEFAULT_PRIMARY_TIMEFRAME = 5  # 默认用于交易的主时间框架
+CSV_HEADER = ["datetime", "open", "high", "low", "close", "volume", "macd", "signal", "hist"]
+CSV_BUFFER_SIZE = 1 << 16
+CSV_FLUSH_ROWS = 10  # 连续写入时每个CSV文件最多累计多少行未刷新
+
+# 超过该时长的MACD状态文件不再恢复（跨越一个以上交易时段，EMA已不具参考性）
+MACD_STATE_MAX_AGE = datetime.timedelta(hours=24)
+
+# 允许下单的时间窗口（美东时间，自零点起的分钟数）：10:00-16:00
+TRADING_WINDOW_START_MIN = 10 * 60
+TRADING_WINDOW_END_MIN = 16 * 60
+
+# 主交易所，用于消除SMART路由下的合约歧义
+PRIMARY_EXCHANGES = {
+    "AAPL": "NASDAQ", "GOOGL": "NASDAQ", "MSFT": "NASDAQ",
+    "TSLA": "NASDAQ", "AMZN": "NASDAQ", "META": "NASDAQ",
+    "NVDA": "NASDAQ", "NFLX": "NASDAQ", "AMD": "NASDAQ",
+    "INTC": "NASDAQ", "NVTS": "NASDAQ", "HIMS": "NASDAQ",
+    "SMR": "NYSE", "NBIS": "NASDAQ", "TEM": "NYSE"
+}
+
+# IBKR tickType -> 字段名
+PRICE_TICK_NAMES = {1: "BID", 2: "ASK", 4: "LAST", 6: "HIGH", 7: "LOW", 9: "CLOSE"}
+SIZE_TICK_NAMES = {0: "BID_SIZE", 3: "ASK_SIZE", 5: "LAST_SIZE", 8: "VOLUME"}
+LAST_PRICE_TICK = 4
+LAST_SIZE_TICK = 5
+RT_VOLUME_TICK = 48
+
+# get_decision_summary 的统计项 -> 决策类型
+DECISION_SUMMARY_KEYS = {
+    'no_signal': 'NO_SIGNAL',
+    'rejected_by_strategy': 'REJECTED_BY_STRATEGY',
+    'rejected_by_position_calc': 'REJECTED_BY_POSITION_CALC',
+    'rejected_by_risk_check': 'REJECTED_BY_RISK_CHECK',
+    'signal_approved': 'SIGNAL_APPROVED',
+    'order_submitted': 'ORDER_SUBMITTED',
+    'order_success': 'ORDER_SUCCESS',
+    'order_failed': 'ORDER_FAILED',
+    'skipped_out_of_window': 'SKIPPED_OUT_OF_WINDOW',
+    'errors': 'ERROR',
+}
 
 
 # ---------- MACD 递推状态 ----------
 class MACDState:
     """维护 MACD(12,26,9) 状态"""
 
+    __slots__ = ("ema12", "ema26", "signal", "a12", "a26", "a9",
+                 "b12", "b26", "b9", "bar_count", "warmup", "last_bar")
+
     def __init__(self, warmup=30):
         self.ema12 = None
         self.ema26 = None
@@ -40,12 +87,19 @@ class MACDState:
         self.a12 = 2 / (12 + 1)
         self.a26 = 2 / (26 + 1)
         self.a9 = 2 / (9 + 1)
+        # 预先计算 (1 - alpha)，避免每根K线重复相减
+        self.b12 = 1 - self.a12
+        self.b26 = 1 - self.a26
+        self.b9 = 1 - self.a9
         self.bar_count = 0
         self.warmup = warmup  # 热身期的bar数
+        self.last_bar = None  # 最近一根计入状态的K线开始时间
 
-    def on_bar(self, close):
-        """传入一根K线收盘价，返回 (macd, signal, hist)"""
+    def on_bar(self, close, bar_time=None):
+        """传入一根K线收盘价（及其开始时间），返回 (macd, signal, hist)"""
         self.bar_count += 1
+        if bar_time is not None:
+            self.last_bar = bar_time
 
         if self.ema12 is None:
             # 初始化
@@ -54,10 +108,10 @@ class MACDState:
             macd = 0.0
             self.signal = macd
         else:
-            self.ema12 = self.a12 * close + (1 - self.a12) * self.ema12
-            self.ema26 = self.a26 * close + (1 - self.a26) * self.ema26
-            macd = self.ema12 - self.ema26
-            self.signal = self.a9 * macd + (1 - self.a9) * self.signal
+            ema12 = self.ema12 = self.a12 * close + self.b12 * self.ema12
+            ema26 = self.ema26 = self.a26 * close + self.b26 * self.ema26
+            macd = ema12 - ema26
+            self.signal = self.a9 * macd + self.b9 * self.signal
 
         hist = macd - self.signal
         return macd, self.signal, hist
@@ -65,6 +119,37 @@ class MACDState:
     def is_warmed_up(self):
         return self.bar_count >= self.warmup
 
+    def to_dict(self):
+        """导出递推状态，便于重启后继续而不必重新热身"""
+        return {
+            "ema12": self.ema12,
+            "ema26": self.ema26,
+            "signal": self.signal,
+            "bar_count": self.bar_count,
+            "warmup": self.warmup,
+            "last_bar": self.last_bar.isoformat() if self.last_bar is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if not isinstance(data, dict):
+            raise ValueError(f"MACD状态应为字典，实际为 {type(data).__name__}")
+        state = cls.__new__(cls)
+        state.__setstate__(data)
+        return state
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, data):
+        self.__init__(warmup=data.get("warmup", 30))
+        self.ema12 = data["ema12"]
+        self.ema26 = data["ema26"]
+        self.signal = data["signal"]
+        self.bar_count = data["bar_count"]
+        last_bar = data.get("last_bar")
+        self.last_bar = datetime.datetime.fromisoformat(last_bar) if last_bar else None
+
 
 # ---------- 主类 ----------
 class MarketDataTracker(IBKRConnection):
@@ -73,19 +158,33 @@ class MarketDataTracker(IBKRConnection):
     with multi-timeframe bar aggregation and MACD
     """
 
-    def __init__(self, client_id=2, enable_trading=False):
+    def __init__(self, client_id=2, enable_trading=False, tick_by_tick=False, verbose=False):
         super().__init__(client_id)
 
+        # 是否逐tick打印行情更新；高频行情下print会拖慢回调线程，默认关闭
+        self.verbose = verbose
+
+        # True时订阅逐笔成交(reqTickByTickData)，不受reqMktData约250ms聚合的限制；
+        # 注意IBKR对同时订阅的逐笔数据数量有限制，且不再推送BID/ASK等L1字段
+        self.tick_by_tick = tick_by_tick
+
         # L1 实时数据缓存
         self.market_data = {}
         self.active_requests = set()
+        self._contract_cache = {}  # (symbol, exchange, currency) -> Contract
 
         # 多股票状态管理 - 基于reqId
         self.req_to_symbol = {}  # reqId -> symbol 映射
         self.current_bars = {}  # reqId -> {timeframe: current_bar}
         self.bars = {}  # reqId -> {timeframe: [bars]}
         self.csv_files = {}  # reqId -> {timeframe: csv_file_path}
+        self._csv_writers = {}  # reqId -> {timeframe: [file, csv.writer, 未刷新行数]}
+        # CSV写入在后台线程完成，tick回调线程只负责入队 (entry, row)；row为None表示关闭文件
+        self._csv_queue = queue.Queue()
+        self._csv_thread = None
         self.macd_states = {}  # reqId -> {timeframe: MACDState}
+        self._last_minute_key = None  # 上一次计算K线起点时所在的epoch分钟
+        self._cached_bar_starts = {}  # timeframe -> 当前分钟对应的K线开始时间
 
         # 交易功能模块
         self.enable_trading = enable_trading
@@ -96,6 +195,9 @@ class MarketDataTracker(IBKRConnection):
         self.risk_manager = None
         self.order_manager = None
         self.trading_journal = None
+        self._decision_file = None  # 当前正在追加的决策日志路径
+        self._decision_fp = None
+        self._decision_counts = Counter()  # 决策类型 -> 次数，随日志增量更新
 
         if enable_trading:
             try:
@@ -132,8 +234,12 @@ class MarketDataTracker(IBKRConnection):
         self.req_to_symbol[req_id] = symbol
         self.current_bars[req_id] = {tf: None for tf in self.timeframes}
         self.bars[req_id] = {tf: [] for tf in self.timeframes}
-        self.macd_states[req_id] = {tf: MACDState(warmup=30) for tf in self.timeframes}
+        self.macd_states[req_id] = {
+            tf: self._load_macd_state(symbol, tf) for tf in self.timeframes
+        }
         self.csv_files[req_id] = {}
+        self._close_csv_writers(req_id)
+        self._csv_writers[req_id] = {}
 
         base_dir = "market_data"
         os.makedirs(base_dir, exist_ok=True)
@@ -148,13 +254,110 @@ class MarketDataTracker(IBKRConnection):
             )
             self.csv_files[req_id][timeframe] = csv_file
 
-            if not os.path.exists(csv_file):
-                with open(csv_file, "w", newline="") as f:
-                    writer = csv.writer(f)
-                    writer.writerow([
-                        "datetime", "open", "high", "low", "close", "volume",
-                        "macd", "signal", "hist"
-                    ])
+            # 文件句柄在整个运行期间保持打开，避免每根K线都open/close一次
+            f = open(csv_file, "a", newline="", buffering=CSV_BUFFER_SIZE)
+            writer = csv.writer(f)
+            if f.tell() == 0:
+                writer.writerow(CSV_HEADER)
+                f.flush()
+            self._csv_writers[req_id][timeframe] = [f, writer, 0]
+
+        if self._csv_thread is None:
+            self._csv_thread = threading.Thread(
+                target=self._csv_writer_loop, name="csv-writer", daemon=True
+            )
+            self._csv_thread.start()
+
+    def _csv_writer_loop(self):
+        """后台线程：按顺序写入K线行；队列清空或累计CSV_FLUSH_ROWS行时刷新到磁盘"""
+        pending = {}  # id(entry) -> 有未刷新行的entry
+        while True:
+            item = self._csv_queue.get()
+            if item is None:
+                return
+
+            entry, row = item
+            try:
+                if row is None:
+                    pending.pop(id(entry), None)
+                    entry[0].close()
+                else:
+                    entry[1].writerow(row)
+                    entry[2] += 1
+                    if entry[2] >= CSV_FLUSH_ROWS:
+                        entry[0].flush()
+                        entry[2] = 0
+                        pending.pop(id(entry), None)
+                    else:
+                        pending[id(entry)] = entry
+            except Exception as e:
+                print(f"[WARN] CSV write failed for {entry[0].name}: {e}")
+
+            # 没有更多待写入的行时立即落盘，已封口的K线不会长时间停留在缓冲区
+            if pending and self._csv_queue.empty():
+                for entry in pending.values():
+                    try:
+                        entry[0].flush()
+                    except Exception as e:
+                        print(f"[WARN] CSV flush failed for {entry[0].name}: {e}")
+                    entry[2] = 0
+                pending.clear()
+
+    @staticmethod
+    def _macd_state_file(symbol, timeframe):
+        return os.path.join(
+            "market_data", f"{timeframe}m", f"{symbol.lower()}_{timeframe}m_macd_state.json"
+        )
+
+    def _load_macd_state(self, symbol, timeframe):
+        """读取上次退出时保存的MACD状态；不存在、损坏或已过期时从头热身"""
+        state_file = self._macd_state_file(symbol, timeframe)
+        try:
+            with open(state_file, "r", encoding="utf-8") as f:
+                state = MACDState.from_dict(json.load(f))
+            if state.bar_count == 0:
+                return state
+            if state.last_bar is None or datetime.datetime.now() - state.last_bar > MACD_STATE_MAX_AGE:
+                print(f"MACD状态已过期，重新热身: {state_file} (最后K线: {state.last_bar})")
+                return MACDState(warmup=30)
+            return state
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print(f"[WARN] 无法恢复MACD状态 {state_file}: {e}")
+        return MACDState(warmup=30)
+
+    def _persist_macd_state(self, req_id, snapshots=None):
+        """保存各时间框架的MACD状态，供下次启动时恢复
+
+        snapshots: {timeframe: MACDState.to_dict()}，默认取当前状态
+        """
+        symbol = self.req_to_symbol[req_id]
+        for timeframe, macd_state in self.macd_states[req_id].items():
+            snapshot = snapshots[timeframe] if snapshots is not None else macd_state.to_dict()
+            state_file = self._macd_state_file(symbol, timeframe)
+            tmp_file = f"{state_file}.tmp"
+            with open(tmp_file, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_file, state_file)
+
+    def _close_csv_writers(self, req_id):
+        """刷新并关闭指定reqId的CSV文件句柄（在写入线程中排在已入队的行之后执行）"""
+        for entry in self._csv_writers.pop(req_id, {}).values():
+            if self._csv_thread is None:
+                entry[0].close()
+            else:
+                self._csv_queue.put((entry, None))
+
+    def close_csv_files(self):
+        """写完队列中的所有行并关闭CSV文件句柄（退出前调用）"""
+        for req_id in list(self._csv_writers):
+            self._close_csv_writers(req_id)
+
+        if self._csv_thread is not None:
+            self._csv_queue.put(None)
+            self._csv_thread.join()
+            self._csv_thread = None
 
     def _resolve_primary_timeframe(self, strategy_config: Dict[str, str]) -> int:
         raw = strategy_config.get("TIMEFRAME") if strategy_config else None
@@ -186,11 +389,8 @@ class MarketDataTracker(IBKRConnection):
         if current_dt is None:
             current_dt = self._get_market_datetime()
 
-        start_time = datetime.time(10, 0)
-        end_time = datetime.time(16, 0)
-        current_time = current_dt.time()
-
-        return start_time <= current_time < end_time
+        minute_of_day = current_dt.hour * 60 + current_dt.minute
+        return TRADING_WINDOW_START_MIN <= minute_of_day < TRADING_WINDOW_END_MIN
 
     def on_connection_established(self):
         print("Ready to request market data")
@@ -206,59 +406,54 @@ class MarketDataTracker(IBKRConnection):
 
     # ---------- TWS 回调 ----------
     def tickPrice(self, reqId, tickType, price, attrib):
-        if reqId not in self.market_data:
-            self.market_data[reqId] = {}
-
-        tick_types = {
-            1: "BID",
-            2: "ASK",
-            4: "LAST",
-            6: "HIGH",
-            7: "LOW",
-            9: "CLOSE",
-        }
-        tick_name = tick_types.get(tickType, f"TICK_{tickType}")
-        self.market_data[reqId][tick_name] = price
-
-        if tick_name == "LAST" and reqId in self.req_to_symbol:
-            try:
-                self._update_bar(reqId, price)
-            except Exception as e:
-                print(f"[WARN] update_bar failed for {self.req_to_symbol[reqId]}: {e}")
+        data = self.market_data.get(reqId)
+        if data is None:
+            data = self.market_data[reqId] = {}
+
+        if tickType == LAST_PRICE_TICK:
+            tick_name = "LAST"
+            data[tick_name] = price
+            if reqId in self.req_to_symbol:
+                try:
+                    self._update_bar(reqId, price)
+                except Exception as e:
+                    print(f"[WARN] update_bar failed for {self.req_to_symbol[reqId]}: {e}")
+        else:
+            tick_name = PRICE_TICK_NAMES.get(tickType) or f"TICK_{tickType}"
+            data[tick_name] = price
 
-        symbol = self.req_to_symbol.get(reqId, f"ReqID_{reqId}")
-        print(f"Price Update - {symbol}, {tick_name}: {price}")
+        if self.verbose:
+            symbol = self.req_to_symbol.get(reqId, f"ReqID_{reqId}")
+            print(f"Price Update - {symbol}, {tick_name}: {price}")
 
     def tickSize(self, reqId, tickType, size):
-        if reqId not in self.market_data:
-            self.market_data[reqId] = {}
-
-        size_types = {
-            0: "BID_SIZE",
-            3: "ASK_SIZE",
-            5: "LAST_SIZE",
-            8: "VOLUME",
-        }
-        tick_name = size_types.get(tickType, f"SIZE_{tickType}")
-        self.market_data[reqId][tick_name] = size
+        data = self.market_data.get(reqId)
+        if data is None:
+            data = self.market_data[reqId] = {}
 
-        if tick_name == "LAST_SIZE":
+        if tickType == LAST_SIZE_TICK:
+            tick_name = "LAST_SIZE"
+            data[tick_name] = size
             self._add_volume(reqId, size)
+        else:
+            tick_name = SIZE_TICK_NAMES.get(tickType) or f"SIZE_{tickType}"
+            data[tick_name] = size
 
-        symbol = self.req_to_symbol.get(reqId, f"ReqID_{reqId}")
-        print(f"Size Update - {symbol}, {tick_name}: {size}")
+        if self.verbose:
+            symbol = self.req_to_symbol.get(reqId, f"ReqID_{reqId}")
+            print(f"Size Update - {symbol}, {tick_name}: {size}")
 
     def tickString(self, reqId, tickType, value):
         """Receive tick string data - 处理RTVolume"""
-        if tickType == 48 and reqId in self.req_to_symbol:  # 48 = RT_VOLUME
+        if tickType == RT_VOLUME_TICK and reqId in self.req_to_symbol:
             try:
                 parts = value.split(';')
                 if len(parts) >= 2 and parts[0] and parts[1]:
                     price = float(parts[0])
                     size = int(float(parts[1]))
 
-                    symbol = self.req_to_symbol[reqId]
-                    print(f"RT Trade - {symbol}, PRICE: {price}, SIZE: {size}")
+                    if self.verbose:
+                        print(f"RT Trade - {self.req_to_symbol[reqId]}, PRICE: {price}, SIZE: {size}")
 
                     self._update_bar(reqId, price)
                     self._add_volume(reqId, size)
@@ -267,6 +462,26 @@ class MarketDataTracker(IBKRConnection):
                 symbol = self.req_to_symbol.get(reqId, f"ReqID_{reqId}")
                 print(f"[WARN] Failed to parse RTVolume for {symbol}: {value}, error: {e}")
 
+    def tickByTickAllLast(self, reqId, tickType, time, price, size, tickAttribLast, exchange, specialConditions):
+        """Receive tick-by-tick trades - 直接驱动K线聚合"""
+        if reqId not in self.market_data:
+            self.market_data[reqId] = {}
+        self.market_data[reqId]["LAST"] = price
+        self.market_data[reqId]["LAST_SIZE"] = size
+
+        if reqId not in self.req_to_symbol:
+            return
+
+        symbol = self.req_to_symbol[reqId]
+        try:
+            self._update_bar(reqId, price)
+        except Exception as e:
+            print(f"[WARN] update_bar failed for {symbol}: {e}")
+        self._add_volume(reqId, size)
+
+        if self.verbose:
+            print(f"Tick Trade - {symbol}, PRICE: {price}, SIZE: {size}")
+
     # ---------- 5m K线聚合 ----------
     def _get_bar_start(self, timestamp, timeframe):
         """计算给定时间在指定时间框架下的K线开始时间"""
@@ -278,10 +493,19 @@ class MarketDataTracker(IBKRConnection):
         return base_time - datetime.timedelta(minutes=minutes_to_subtract)
 
     def _update_bar(self, req_id, last_price):
-        now = datetime.datetime.now()
+        # 同一分钟内的tick共享K线起点：每个tick只读取time.time()，
+        # 分钟切换时才构造datetime并重新计算各时间框架的起点
+        minute_key = int(time.time() // 60)
+        if minute_key != self._last_minute_key:
+            minute_start = datetime.datetime.fromtimestamp(minute_key * 60)
+            self._cached_bar_starts = {
+                tf: self._get_bar_start(minute_start, tf) for tf in self.timeframes
+            }
+            self._last_minute_key = minute_key
+        bar_starts = self._cached_bar_starts
 
         for timeframe in self.timeframes:
-            bar_start = self._get_bar_start(now, timeframe)
+            bar_start = bar_starts[timeframe]
             current_bar = self.current_bars[req_id][timeframe]
 
             if current_bar is None:
@@ -331,7 +555,7 @@ class MarketDataTracker(IBKRConnection):
         symbol = self.req_to_symbol[req_id]
 
         macd_state = self.macd_states[req_id][timeframe]
-        macd, signal, hist = macd_state.on_bar(bar["close"])
+        macd, signal, hist = macd_state.on_bar(bar["close"], bar["datetime"])
         bar["macd"], bar["signal"], bar["hist"] = macd, signal, hist
         self.bars[req_id][timeframe].append(bar)
 
@@ -352,14 +576,11 @@ class MarketDataTracker(IBKRConnection):
 
         macd_out = (f"{macd:.6f}", f"{signal:.6f}", f"{hist:.6f}") if warmed else ("", "", "")
 
-        csv_file = self.csv_files[req_id][timeframe]
-        with open(csv_file, "a", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                bar["datetime"].strftime("%Y-%m-%d %H:%M:%S"),
-                bar["open"], bar["high"], bar["low"], bar["close"], bar["volume"],
-                macd_out[0], macd_out[1], macd_out[2]
-            ])
+        self._csv_queue.put((self._csv_writers[req_id][timeframe], (
+            bar["datetime"].strftime("%Y-%m-%d %H:%M:%S"),
+            bar["open"], bar["high"], bar["low"], bar["close"], bar["volume"],
+            macd_out[0], macd_out[1], macd_out[2]
+        )))
 
         self.current_bars[req_id][timeframe] = None
 
@@ -367,30 +588,36 @@ class MarketDataTracker(IBKRConnection):
         if req_id not in self.current_bars:
             return
 
+        # 在封口未完成的K线之前保存状态：重启后同一周期的K线会重新形成，
+        # 若把残缺K线计入已保存的EMA，该周期就会被递推两次
+        snapshots = {tf: state.to_dict() for tf, state in self.macd_states[req_id].items()}
+
         for timeframe in self.timeframes:
             bar = self.current_bars[req_id].get(timeframe)
             if bar is not None:
                 self._close_bar(req_id, timeframe)
 
+        self._persist_macd_state(req_id, snapshots)
+
     # ---------- 合约 & 订阅 ----------
     def create_stock_contract(self, symbol, exchange="SMART", currency="USD"):
+        """返回股票合约；同一(symbol, exchange, currency)复用缓存的Contract，调用方不应修改它"""
+        key = (symbol, exchange, currency)
+        contract = self._contract_cache.get(key)
+        if contract is not None:
+            return contract
+
         contract = Contract()
         contract.symbol = symbol
         contract.secType = "STK"
         contract.exchange = exchange
         contract.currency = currency
 
-        primary_exchanges = {
-            "AAPL": "NASDAQ", "GOOGL": "NASDAQ", "MSFT": "NASDAQ",
-            "TSLA": "NASDAQ", "AMZN": "NASDAQ", "META": "NASDAQ",
-            "NVDA": "NASDAQ", "NFLX": "NASDAQ", "AMD": "NASDAQ",
-            "INTC": "NASDAQ", "NVTS": "NASDAQ", "HIMS": "NASDAQ",
-            "SMR": "NYSE", "NBIS": "NASDAQ", "TEM": "NYSE"
-        }
-
-        if symbol in primary_exchanges:
-            contract.primaryExchange = primary_exchanges[symbol]
+        primary_exchange = PRIMARY_EXCHANGES.get(symbol)
+        if primary_exchange is not None:
+            contract.primaryExchange = primary_exchange
 
+        self._contract_cache[key] = contract
         return contract
 
     def request_market_data(self, contract, req_id=None):
@@ -400,13 +627,20 @@ class MarketDataTracker(IBKRConnection):
         self._setup_stock(req_id, contract.symbol)
 
         self.active_requests.add(req_id)
-        self.reqMktData(req_id, contract, "233", False, False, [])
-        print(f"Requesting market data for {contract.symbol} with ReqID: {req_id}")
+        if self.tick_by_tick:
+            self.reqTickByTickData(req_id, contract, "Last", 0, False)
+            print(f"Requesting tick-by-tick data for {contract.symbol} with ReqID: {req_id}")
+        else:
+            self.reqMktData(req_id, contract, "233", False, False, [])
+            print(f"Requesting market data for {contract.symbol} with ReqID: {req_id}")
         return req_id
 
     def cancel_market_data(self, req_id):
         if req_id in self.active_requests:
-            self.cancelMktData(req_id)
+            if self.tick_by_tick:
+                self.cancelTickByTickData(req_id)
+            else:
+                self.cancelMktData(req_id)
             self.active_requests.remove(req_id)
             print(f"Cancelled market data request: {req_id}")
 
@@ -661,44 +895,41 @@ class MarketDataTracker(IBKRConnection):
     def _log_trading_decision(self, decision_log):
         """记录交易决策过程"""
         try:
-            if not hasattr(self, 'decision_logs'):
-                self.decision_logs = []
-
-            self.decision_logs.append(decision_log)
+            # 决策只写入日志文件，内存中仅保留按类型的计数
+            self._decision_counts[decision_log.get('decision')] += 1
 
             logs_dir = Path('trading_logs')
-            logs_dir.mkdir(exist_ok=True)
-
-            import datetime
             today = datetime.date.today().strftime('%Y%m%d')
             decision_file = logs_dir / f'trading_decisions_{today}.json'
 
-            import json
-            with open(decision_file, 'w', encoding='utf-8') as f:
-                json.dump(self.decision_logs, f, indent=2, ensure_ascii=False)
+            # 文件始终保持为合法的JSON数组：新条目覆盖结尾的"\n]"后追加，
+            # 无需每次重写全部历史决策
+            entry = json.dumps([decision_log], indent=2, ensure_ascii=False)
+            if self._decision_fp is None or decision_file != self._decision_file:
+                if self._decision_fp is not None:
+                    self._decision_fp.close()
+                logs_dir.mkdir(exist_ok=True)
+                self._decision_fp = open(decision_file, 'wb')
+                self._decision_file = decision_file
+                self._decision_fp.write(entry.encode('utf-8'))
+            else:
+                self._decision_fp.seek(-2, os.SEEK_END)
+                self._decision_fp.write(f",\n{entry[2:-2]}\n]".encode('utf-8'))
+            self._decision_fp.flush()
 
         except Exception as e:
             print(f"[Error] 决策日志记录失败: {e}")
 
     def get_decision_summary(self):
         """获取决策统计概要"""
-        if not hasattr(self, 'decision_logs') or not self.decision_logs:
+        counts = self._decision_counts
+        total = sum(counts.values())
+        if not total:
             return {'total': 0}
 
-        decisions = [log['decision'] for log in self.decision_logs]
-        summary = {
-            'total': len(decisions),
-            'no_signal': decisions.count('NO_SIGNAL'),
-            'rejected_by_strategy': decisions.count('REJECTED_BY_STRATEGY'),
-            'rejected_by_position_calc': decisions.count('REJECTED_BY_POSITION_CALC'),
-            'rejected_by_risk_check': decisions.count('REJECTED_BY_RISK_CHECK'),
-            'signal_approved': decisions.count('SIGNAL_APPROVED'),
-            'order_submitted': decisions.count('ORDER_SUBMITTED'),
-            'order_success': decisions.count('ORDER_SUCCESS'),
-            'order_failed': decisions.count('ORDER_FAILED'),
-            'skipped_out_of_window': decisions.count('SKIPPED_OUT_OF_WINDOW'),
-            'errors': decisions.count('ERROR')
-        }
+        summary = {'total': total}
+        for key, decision in DECISION_SUMMARY_KEYS.items():
+            summary[key] = counts[decision]
 
         return summary
 
@@ -737,7 +968,9 @@ def main():
     else:
         print("仅启用数据收集功能，不会进行交易")
 
-    tracker = MarketDataTracker(client_id=982, enable_trading=enable_trading)
+    tick_by_tick = input("是否订阅逐笔成交数据(tick-by-tick)? (y/N): ").lower() == 'y'
+
+    tracker = MarketDataTracker(client_id=982, enable_trading=enable_trading, tick_by_tick=tick_by_tick)
 
     try:
         print("正在连接到TWS...")
@@ -817,6 +1050,10 @@ def main():
             except:
                 pass
 
+    finally:
+        # 无论以何种方式退出，都写完后台队列中的K线并关闭CSV文件
+        tracker.close_csv_files()
+
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,7 @@
 """Strategy registry and convenience helpers."""
 
-from typing import Dict, Optional, Type
+from functools import lru_cache
+from typing import Dict, Optional, Tuple, Type
 
 from .base import BaseStrategy
 from .macd import MACDStrategy
@@ -15,6 +16,13 @@ STRATEGY_REGISTRY: Dict[str, Type[BaseStrategy]] = {
 def register_strategy(name: str, strategy_cls: Type[BaseStrategy]) -> None:
     """Register a new strategy class under the provided name."""
     STRATEGY_REGISTRY[name.upper()] = strategy_cls
+    strategy_names.cache_clear()
+
+
+@lru_cache(maxsize=1)
+def strategy_names() -> Tuple[str, ...]:
+    """Registered strategy names, cached until the next ``register_strategy`` call."""
+    return tuple(STRATEGY_REGISTRY)
 
 
 def get_strategy_class(name: str) -> Optional[Type[BaseStrategy]]:
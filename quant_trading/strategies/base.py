@@ -1,6 +1,8 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional
+
+import numpy as np
 
 
 class BaseStrategy:
@@ -27,6 +29,20 @@ class BaseStrategy:
         """Decide if the generated signal should result in real trading action."""
         raise NotImplementedError
 
+    def event_bar_mask(
+        self,
+        symbol_codes: np.ndarray,
+        macd: np.ndarray,
+        signal: np.ndarray,
+        hist: np.ndarray,
+    ) -> Optional[np.ndarray]:
+        """Flag the bars a backtest must evaluate, or return None for all of them.
+
+        Event-driven strategies can return a boolean array aligned with the
+        bars; the backtest engine then skips the strategy call on the rest.
+        """
+        return None
+
     def configure(self, config: Dict[str, str]) -> None:
         """Store configuration for the strategy instance."""
         self.config = dict(config or {})
@@ -5,6 +5,8 @@ from __future__ import annotations
 
 from typing import Dict, Any
 
+import numpy as np
+
 from .base import BaseStrategy
 from quant_trading.config.strategy_defaults import MACD_DEFAULT_CONFIG
 
@@ -87,6 +89,40 @@ class MACDStrategy(BaseStrategy):
             'trade_type': 'NONE'
         }
 
+    def event_bar_mask(
+        self,
+        symbol_codes: np.ndarray,
+        macd: np.ndarray,
+        signal: np.ndarray,
+        hist: np.ndarray,
+    ) -> np.ndarray:
+        """Only histogram sign flips can trade.
+
+        Besides each flip, the bar right before it and every symbol's first and
+        last bar are kept, so ``last_signals`` always holds the true previous
+        histogram when a flip is evaluated.
+        """
+        order = np.argsort(symbol_codes, kind="stable")
+        codes = symbol_codes[order]
+        hist_sorted = hist[order]
+
+        first = np.ones(len(codes), dtype=bool)
+        first[1:] = codes[1:] != codes[:-1]
+        last = np.ones(len(codes), dtype=bool)
+        last[:-1] = first[1:]
+
+        prev_hist = np.zeros_like(hist_sorted)
+        prev_hist[1:] = hist_sorted[:-1]
+        flips = ((hist_sorted > 0) & (prev_hist <= 0)) | ((hist_sorted < 0) & (prev_hist >= 0))
+        flips |= first
+
+        active = flips | last
+        active[:-1] |= flips[1:] & ~first[1:]
+
+        mask = np.empty(len(codes), dtype=bool)
+        mask[order] = active
+        return mask
+
     def should_trade(self, signal: Dict[str, Any], current_positions: Dict[str, Any]) -> Dict[str, Any]:
         if signal['confidence'] < 0.1:
             return {
@@ -0,0 +1 @@
+"""Shared numerical helpers for the quant_trading package."""
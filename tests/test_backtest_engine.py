@@ -4,6 +4,7 @@ import pandas as pd
 
 from quant_trading.backtesting.engine import BacktestEngine, HistoricalDataLoader
 from quant_trading.strategies.base import BaseStrategy
+from quant_trading.strategies.macd import MACDStrategy
 
 
 class DummyLoader(HistoricalDataLoader):
@@ -87,3 +88,60 @@ def test_backtest_engine_executes_round_trip():
 	assert closed["symbol"] == "AAPL"
 	assert closed["quantity"] == 1
 	assert result.net_profit == closed["pnl"]
+
+
+def test_loader_reuses_parquet_cache_until_csv_changes(tmp_path):
+	csv_path = tmp_path / "aapl_5m_bars_macd.csv"
+	pd.DataFrame(
+		{
+			"datetime": ["2024-01-01 09:35", "2024-01-01 09:30", "2024-01-01 09:40"],
+			"open": [101.0, 100.0, 102.0],
+			"high": [102.0, 101.0, 103.0],
+			"low": [100.5, 99.0, 101.5],
+			"close": [101.5, 100.5, "bad"],
+			"volume": [1200, 1000, 900],
+		}
+	).to_csv(csv_path, index=False)
+	loader = HistoricalDataLoader(base_dir=tmp_path, timeframe="5m", cache_dir=tmp_path / "cache")
+
+	first = loader.load_symbol("aapl")
+	cached = list((tmp_path / "cache").glob("aapl_5m_*.parquet"))
+	first["close"] = 0.0
+	second = HistoricalDataLoader(base_dir=tmp_path, timeframe="5m", cache_dir=tmp_path / "cache").load_symbol("AAPL")
+
+	assert len(cached) == 1
+	assert second["close"].tolist() == [100.5, 101.5]
+	assert second["symbol"].unique().tolist() == ["AAPL"]
+	assert {"macd", "signal", "hist"}.issubset(second.columns)
+
+
+def test_skipping_idle_bars_matches_full_evaluation():
+	hist = [0.0, 0.2, 0.0, 0.3, -0.1, -0.2, 0.0, -0.4, 0.5, 0.1, 0.0, 0.0, -0.3, 0.2]
+	times = pd.date_range("2024-01-01 09:30", periods=len(hist), freq="5min")
+	frames = []
+	for offset, symbol in enumerate(["AAPL", "MSFT"]):
+		rotated = hist[offset:] + hist[:offset]
+		frames.append(
+			pd.DataFrame(
+				{
+					"datetime": times,
+					"close": [100.0 + i + offset for i in range(len(hist))],
+					"macd": rotated,
+					"signal": [0.0] * len(hist),
+					"hist": rotated,
+					"symbol": [symbol] * len(hist),
+				}
+			)
+		)
+	frame = pd.concat(frames, ignore_index=True)
+
+	results = {}
+	for skip in (False, True):
+		strategy = MACDStrategy()
+		engine = BacktestEngine(strategy=strategy, data_loader=DummyLoader(frame), skip_idle_bars=skip)
+		results[skip] = (engine.run(["AAPL", "MSFT"], start="2024-01-01"), strategy.last_signals)
+
+	full, skipped = results[False], results[True]
+	assert skipped[0].trades == full[0].trades
+	assert skipped[0].equity_curve.equals(full[0].equity_curve)
+	assert skipped[1] == full[1]
@@ -0,0 +1,112 @@
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from quant_trading.backtesting.cache_exporter import _slice_period, export_backtest_caches
+from quant_trading.backtesting.engine import BacktestResult, BacktestSummary, HistoricalDataLoader
+
+
+class FrameLoader(HistoricalDataLoader):
+	def __init__(self, frames) -> None:
+		super().__init__(base_dir="unused", timeframe="5m")
+		self._frames = frames
+
+	def load_symbol(self, symbol: str) -> pd.DataFrame:  # type: ignore[override]
+		if symbol not in self._frames:
+			raise FileNotFoundError(symbol)
+		return self._frames[symbol].copy()
+
+
+def _candles(symbol: str) -> pd.DataFrame:
+	return pd.DataFrame(
+		{
+			"datetime": pd.to_datetime(["2024-01-01 09:30", "2024-01-01 09:35", "2024-01-01 09:40"]),
+			"open": [100.0, 101.0, 102.0],
+			"high": [101.0, 102.0, 103.0],
+			"low": [99.0, 100.5, 101.5],
+			"close": [100.5, 101.5, 102.5],
+			"volume": [1000, 1200, 900],
+			"symbol": [symbol] * 3,
+		}
+	)
+
+
+def _result() -> BacktestResult:
+	return BacktestResult(
+		start=pd.Timestamp("2024-01-01 09:30"),
+		end=pd.Timestamp("2024-01-01 09:35"),
+		initial_capital=100_000.0,
+		ending_equity=100_001.0,
+		net_profit=1.0,
+		return_pct=0.00001,
+		annualized_return=0.0,
+		max_drawdown=0.0,
+		closed_trades=[
+			{
+				"symbol": "AAPL",
+				"direction": "LONG",
+				"quantity": 1,
+				"entry_price": 100.5,
+				"exit_price": 101.5,
+				"entry_time": pd.Timestamp("2024-01-01 09:30"),
+				"exit_time": pd.Timestamp("2024-01-01 09:35"),
+				"pnl": 1.0,
+			}
+		],
+		summaries=[BacktestSummary(symbol="AAPL", total_trades=1, net_pnl=1.0, return_pct=0.00001, win_rate=1.0)],
+	)
+
+
+def test_export_writes_filtered_candles_and_trades(tmp_path):
+	loader = FrameLoader({"AAPL": _candles("AAPL"), "MSFT": _candles("MSFT")})
+
+	written = export_backtest_caches(
+		result=_result(),
+		loader=loader,
+		symbols=["AAPL", "MSFT", "TSLA"],
+		timeframe="5m",
+		strategy_name="macd",
+		output_dir=tmp_path,
+	)
+
+	assert [path.name for path in written] == ["aapl_5m_backtest.json", "msft_5m_backtest.json"]
+	assert all(Path(path).parent == tmp_path / "MACD" / "5m" for path in written)
+
+	payload = json.loads(written[0].read_text(encoding="utf-8"))
+	assert payload["symbol"] == "AAPL"
+	assert payload["total_trades"] == 1
+	assert payload["closed_trades"][0]["entry_time"] == "2024-01-01T09:30:00"
+	assert [candle["datetime"] for candle in payload["candles"]] == [
+		"2024-01-01T09:30:00",
+		"2024-01-01T09:35:00",
+	]
+	assert payload["candles"][0]["volume"] == 1000.0
+
+	msft = json.loads(written[1].read_text(encoding="utf-8"))
+	assert msft["closed_trades"] == []
+	assert msft["total_trades"] == 0
+
+
+def test_slice_period_handles_sorted_and_unsorted_candles():
+	candles = _candles("AAPL")
+	start = pd.Timestamp("2024-01-01 09:35")
+	end = pd.Timestamp("2024-01-01 09:40")
+
+	sorted_slice = _slice_period(candles, start, end)
+	unsorted_slice = _slice_period(candles.iloc[::-1], start, end)
+
+	assert sorted_slice["close"].tolist() == [101.5, 102.5]
+	assert sorted(unsorted_slice["close"].tolist()) == [101.5, 102.5]
+
+
+def test_parallel_export_matches_sequential_output(tmp_path):
+	loader = FrameLoader({"AAPL": _candles("AAPL"), "MSFT": _candles("MSFT")})
+	common = dict(result=_result(), loader=loader, symbols=["AAPL", "MSFT"], timeframe="5m", strategy_name="macd")
+
+	sequential = export_backtest_caches(output_dir=tmp_path / "seq", max_workers=1, **common)
+	parallel = export_backtest_caches(output_dir=tmp_path / "par", max_workers=2, **common)
+
+	assert [path.name for path in parallel] == [path.name for path in sequential]
+	for seq_path, par_path in zip(sequential, parallel):
+		assert seq_path.read_bytes() == par_path.read_bytes()
@@ -0,0 +1,26 @@
+import numpy as np
+import pandas as pd
+
+from quant_trading.utils.ewma import compute_macd
+
+
+def test_compute_macd_matches_pandas_ewm():
+	rng = np.random.default_rng(7)
+	close = 100 + np.cumsum(rng.normal(0, 1, 500))
+	close[10:15] = close[10]
+
+	series = pd.Series(close)
+	macd = series.ewm(span=12, adjust=False).mean() - series.ewm(span=26, adjust=False).mean()
+	signal = macd.ewm(span=9, adjust=False).mean()
+
+	got_macd, got_signal, got_hist = compute_macd(close, 12, 26, 9)
+
+	np.testing.assert_array_equal(got_macd, macd.to_numpy())
+	np.testing.assert_array_equal(got_signal, signal.to_numpy())
+	np.testing.assert_array_equal(got_hist, (macd - signal).to_numpy())
+
+
+def test_compute_macd_handles_empty_input():
+	macd, signal, hist = compute_macd(np.array([]), 12, 26, 9)
+
+	assert macd.size == signal.size == hist.size == 0
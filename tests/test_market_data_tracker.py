@@ -0,0 +1,129 @@
+import datetime
+import json
+import pickle
+import time
+from types import SimpleNamespace
+
+from quant_trading.data import market_data_tracker
+from quant_trading.data.market_data_tracker import MarketDataTracker
+
+
+def test_decision_log_appends_keep_file_identical_to_full_dump(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	tracker = MarketDataTracker(client_id=3)
+	logs = [
+		{"symbol": "AAPL", "decision": "NO_SIGNAL", "reason": "无信号", "macd_data": {"macd": 0.5}},
+		{"symbol": "MSFT", "decision": "ERROR", "reason": "失败", "timestamp": 1.5},
+		{"symbol": "TSLA", "decision": "SKIPPED_OUT_OF_WINDOW", "details": []},
+	]
+	for log in logs:
+		tracker._log_trading_decision(log)
+
+	decision_file = tracker._decision_file
+	expected = json.dumps(logs, indent=2, ensure_ascii=False)
+	assert decision_file.read_text(encoding="utf-8") == expected
+	assert json.loads(decision_file.read_text(encoding="utf-8")) == logs
+
+
+def test_decision_summary_counts_logged_decisions(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	tracker = MarketDataTracker(client_id=3)
+	assert tracker.get_decision_summary() == {"total": 0}
+
+	for decision in ["NO_SIGNAL", "NO_SIGNAL", "ERROR", "ORDER_SUBMITTED"]:
+		tracker._log_trading_decision({"symbol": "AAPL", "decision": decision})
+
+	summary = tracker.get_decision_summary()
+	assert summary["total"] == 4
+	assert summary["no_signal"] == 2
+	assert summary["errors"] == 1
+	assert summary["order_submitted"] == 1
+	assert summary["order_failed"] == 0
+	assert list(summary) == ["total", "no_signal", "rejected_by_strategy", "rejected_by_position_calc",
+		"rejected_by_risk_check", "signal_approved", "order_submitted", "order_success", "order_failed",
+		"skipped_out_of_window", "errors"]
+
+
+def test_tick_by_tick_trades_build_bars(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	frozen = datetime.datetime(2024, 3, 4, 10, 1, 30).timestamp()
+	monkeypatch.setattr(market_data_tracker, "time", SimpleNamespace(time=lambda: frozen))
+	tracker = MarketDataTracker(client_id=3, tick_by_tick=True)
+	tracker._setup_stock(1, "AAPL")
+
+	tracker.tickByTickAllLast(1, 1, 0, 100.0, 10, None, "ISLAND", "")
+	tracker.tickByTickAllLast(1, 1, 0, 101.5, 5, None, "ISLAND", "")
+	tracker.tickByTickAllLast(2, 1, 0, 50.0, 1, None, "ISLAND", "")
+
+	bar = tracker.current_bars[1][1]
+	assert (bar["open"], bar["high"], bar["close"], bar["volume"]) == (100.0, 101.5, 101.5, 15)
+	assert tracker.get_market_data(1) == {"LAST": 101.5, "LAST_SIZE": 5}
+	assert tracker.get_market_data(2) == {"LAST": 50.0, "LAST_SIZE": 1}
+	tracker.close_csv_files()
+
+
+def test_macd_state_survives_restart_without_the_partial_bar(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	tracker = MarketDataTracker(client_id=3)
+	tracker._setup_stock(1, "AAPL")
+	state = tracker.macd_states[1][5]
+	bar_time = datetime.datetime.now().replace(second=0, microsecond=0) - datetime.timedelta(minutes=30)
+	for close in [100.0, 101.0, 99.5, 102.25]:
+		bar_time += datetime.timedelta(minutes=5)
+		state.on_bar(close, bar_time)
+	before_shutdown = state.to_dict()
+	tracker.tickPrice(1, 4, 104.0, None)
+	tracker._close_all_active_bars(1)
+	tracker.close_csv_files()
+	assert state.bar_count == 5
+
+	restarted = MarketDataTracker(client_id=3)
+	restarted._setup_stock(1, "AAPL")
+	restored = restarted.macd_states[1][5]
+	restarted.close_csv_files()
+
+	assert restored.to_dict() == before_shutdown
+	assert restored.last_bar == bar_time
+	assert pickle.loads(pickle.dumps(restored)).to_dict() == before_shutdown
+
+
+def test_stale_or_corrupt_macd_state_starts_fresh(tmp_path, monkeypatch, capsys):
+	monkeypatch.chdir(tmp_path)
+	stale = MarketDataTracker._macd_state_file("AAPL", 1)
+	(tmp_path / stale).parent.mkdir(parents=True)
+	(tmp_path / stale).write_text(json.dumps({
+		"ema12": 100.0, "ema26": 99.0, "signal": 0.5, "bar_count": 40, "warmup": 30,
+		"last_bar": (datetime.datetime.now() - datetime.timedelta(days=3)).isoformat(),
+	}))
+	for timeframe, content in [(3, "null"), (5, "[]"), (10, '"x"')]:
+		state_file = tmp_path / MarketDataTracker._macd_state_file("AAPL", timeframe)
+		state_file.parent.mkdir(parents=True)
+		state_file.write_text(content)
+
+	tracker = MarketDataTracker(client_id=3)
+	tracker._setup_stock(1, "AAPL")
+	tracker.close_csv_files()
+
+	assert all(state.bar_count == 0 and state.ema12 is None for state in tracker.macd_states[1].values())
+	assert capsys.readouterr().out.count("[WARN] 无法恢复MACD状态") == 3
+
+
+def test_closed_bar_reaches_disk_without_shutdown(tmp_path, monkeypatch):
+	monkeypatch.chdir(tmp_path)
+	clock = [datetime.datetime(2024, 3, 4, 10, 1, 30).timestamp()]
+	monkeypatch.setattr(market_data_tracker, "time", SimpleNamespace(time=lambda: clock[0]))
+	tracker = MarketDataTracker(client_id=3)
+	tracker._setup_stock(1, "AAPL")
+
+	tracker.tickPrice(1, 4, 100.0, None)
+	clock[0] += 60
+	tracker.tickPrice(1, 4, 101.0, None)
+
+	csv_file = tmp_path / tracker.csv_files[1][1]
+	deadline = time.monotonic() + 5
+	while csv_file.read_text().count("\n") < 2 and time.monotonic() < deadline:
+		time.sleep(0.01)
+	try:
+		assert csv_file.read_text().splitlines()[1].startswith("2024-03-04 10:01:00,100.0,")
+	finally:
+		tracker.close_csv_files()
@@ -0,0 +1,93 @@
+import threading
+
+from ibapi.contract import Contract
+
+from quant_trading.core.order_manager import OrderManager
+
+
+class RecordingClient:
+	def __init__(self) -> None:
+		self.placed = []
+		self.cancelled = []
+
+	def placeOrder(self, order_id, contract, order):
+		self.placed.append((order_id, contract.symbol, order.orderType))
+
+	def cancelOrder(self, order_id):
+		self.cancelled.append(order_id)
+
+
+def _contract(symbol: str) -> Contract:
+	contract = Contract()
+	contract.symbol = symbol
+	return contract
+
+
+def test_active_orders_drop_filled_and_cancelled_orders():
+	client = RecordingClient()
+	manager = OrderManager(client)
+	manager.set_next_order_id(10)
+
+	manager.place_bracket_order(_contract("AAPL"), "BUY", 5, 100.0, 97.0)
+	manager.place_market_order(_contract("MSFT"), "SELL", 3)
+	assert sorted(manager.get_active_orders()) == [10, 11, 12]
+
+	manager.orderStatus(10, "Filled", 5, 0, 100.1, 0, 0, 100.1, 0, "", 0.0)
+	manager.cancel_order(12)
+	active = manager.get_active_orders()
+
+	assert list(active) == [11]
+	assert active[11]["order_type"] == "STOP"
+	assert manager.active_orders[10].status == "Filled"
+
+	manager.cancel_all_orders()
+	assert client.cancelled == [12, 11]
+	assert manager.get_active_orders() == {}
+
+
+def test_quiet_manager_prints_nothing(capsys):
+	manager = OrderManager(RecordingClient(), verbose=False)
+	manager.set_next_order_id(1)
+
+	manager.place_bracket_order(_contract("AAPL"), "BUY", 5, 100.0, 97.0)
+	manager.orderStatus(1, "Filled", 5, 0, 100.1, 0, 0, 100.1, 0, "", 0.0)
+
+	assert capsys.readouterr().out == ""
+	assert manager.active_orders[1].status == "Filled"
+
+
+def test_status_events_are_pushed_once_per_change():
+	manager = OrderManager(RecordingClient(), verbose=False)
+	manager.set_next_order_id(1)
+	manager.place_market_order(_contract("AAPL"), "BUY", 5)
+
+	manager.orderStatus(1, "Submitted", 0, 5, 0.0, 0, 0, 0.0, 0, "", 0.0)
+	manager.orderStatus(1, "Submitted", 0, 5, 0.0, 0, 0, 0.0, 0, "", 0.0)
+	manager.orderStatus(1, "Filled", 5, 0, 100.0, 0, 0, 100.0, 0, "", 0.0)
+
+	assert manager.next_status_event(timeout=0) == (1, "Submitted", 0, 5, 0.0)
+	assert manager.next_status_event(timeout=0) == (1, "Filled", 5, 0, 100.0)
+	assert manager.next_status_event(timeout=0) is None
+
+
+def test_callbacks_on_another_thread_bypass_batched_output(capsys):
+	manager = OrderManager(RecordingClient())
+	manager.set_next_order_id(1)
+	manager.place_market_order(_contract("AAPL"), "BUY", 5)
+	capsys.readouterr()
+
+	reader_output = []
+
+	def place_with_reader_callback(order_id, contract, order):
+		reader = threading.Thread(
+			target=manager.orderStatus, args=(1, "Filled", 5, 0, 100.0, 0, 0, 100.0, 0, "", 0.0)
+		)
+		reader.start()
+		reader.join()
+		reader_output.append(capsys.readouterr().out)
+
+	manager.client.placeOrder = place_with_reader_callback
+	manager.place_market_order(_contract("MSFT"), "SELL", 3)
+
+	assert "AAPL" in reader_output[0]
+	assert "MSFT" in capsys.readouterr().out
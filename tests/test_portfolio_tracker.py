@@ -0,0 +1,102 @@
+import threading
+from types import SimpleNamespace
+
+from quant_trading.core.portfolio_tracker import PortfolioTracker
+
+
+def _contract(symbol: str, currency: str = "USD") -> SimpleNamespace:
+	return SimpleNamespace(symbol=symbol, secType="STK", currency=currency, exchange="SMART")
+
+
+def test_positions_df_merges_portfolio_updates_and_refreshes_on_callbacks():
+	tracker = PortfolioTracker(client_id=5)
+	tracker.position("DU1", _contract("AAPL"), 10, 150.0)
+	tracker.position("DU1", _contract("MSFT"), -5, 300.0)
+
+	before = tracker.get_positions_df()
+	assert before["marketValue"].tolist() == [1500.0, -1500.0]
+
+	tracker.updatePortfolio(_contract("AAPL"), 10, 160.0, 1600.0, 150.0, 100.0, 5.0, "DU1")
+	after = tracker.get_positions_df()
+
+	assert after["marketPrice"].tolist() == [160.0, 300.0]
+	assert after["dailyPnl"].tolist() == [105.0, 0.0]
+	assert round(after.loc[0, "unrealizedPnlRatio"], 6) == round(100.0 / 1500.0, 6)
+	assert tracker.portfolio_items[0]["marketValue"] == 1600.0
+
+
+def test_fetch_portfolio_data_wakes_on_download_end_callbacks():
+	tracker = PortfolioTracker(client_id=5)
+	tracker.connected = True
+	tracker.accountDownloadEnd("DU1")
+	assert tracker.fetch_portfolio_data(timeout=0) is False
+
+	tracker.positionEnd()
+	assert tracker.fetch_portfolio_data(timeout=0) is True
+
+
+def _execution(exec_id, side, shares, price, when="20990101 10:00:00", account="DU1"):
+	return SimpleNamespace(execId=exec_id, time=when, acctNumber=account, side=side, shares=shares, price=price)
+
+
+def test_live_positions_follow_executions():
+	tracker = PortfolioTracker(client_id=5)
+	tracker.position("DU1", _contract("AAPL"), 10, 150.0)
+
+	tracker.execDetails(1, _contract("AAPL"), _execution("e1", "BOT", 10, 160.0))
+	tracker.execDetails(1, _contract("MSFT"), _execution("e2", "SLD", 5, 300.0))
+	live = tracker.get_positions_df(live=True)
+
+	assert live["symbol"].tolist() == ["AAPL", "MSFT"]
+	assert live["position"].tolist() == [20.0, -5.0]
+	assert live["avgCost"].tolist() == [155.0, 300.0]
+	assert tracker.get_positions_df()["position"].tolist() == [10.0]
+
+
+def test_live_positions_ignore_repeated_and_already_reported_executions():
+	tracker = PortfolioTracker(client_id=5)
+	tracker.position("DU1", _contract("AAPL"), 10, 150.0)
+
+	fill = _execution("e1", "BOT", 10, 160.0)
+	tracker.execDetails(1, _contract("AAPL"), fill)
+	tracker.execDetails(1, _contract("AAPL"), fill)
+	tracker.execDetails(1, _contract("AAPL"), _execution("e0", "BOT", 10, 140.0, when="20200101  09:31:00 US/Eastern"))
+
+	live = tracker.get_positions_df(live=True)
+	assert live["position"].tolist() == [20.0]
+	assert live["avgCost"].tolist() == [155.0]
+
+
+def test_positions_df_uses_latest_portfolio_update_per_symbol():
+	tracker = PortfolioTracker(client_id=5)
+	tracker.position("DU1", _contract("AAPL"), 10, 150.0)
+	tracker.updatePortfolio(_contract("AAPL"), 10, 155.0, 1550.0, 150.0, 50.0, 0.0, "DU1")
+	tracker.updatePortfolio(_contract("AAPL"), 10, 160.0, 1600.0, 150.0, 100.0, 0.0, "DU1")
+
+	positions = tracker.get_positions_df()
+
+	assert len(positions) == 1
+	assert positions["marketValue"].tolist() == [1600.0]
+
+
+def test_reads_during_callbacks_always_see_whole_rows():
+	tracker = PortfolioTracker(client_id=5)
+	tracker.position("DU1", _contract("AAPL"), 10, 150.0)
+	tracker.updatePortfolio(_contract("AAPL"), 10, 160.0, 1600.0, 150.0, 100.0, 5.0, "DU1")
+	done = threading.Event()
+
+	def feed_callbacks():
+		for i in range(3000):
+			tracker.position("DU1", _contract("MSFT"), i, 300.0)
+			tracker.updatePortfolio(_contract("MSFT"), i, 310.0, 310.0 * i, 300.0, 10.0 * i, 0.0, "DU1")
+		done.set()
+
+	writer = threading.Thread(target=feed_callbacks)
+	writer.start()
+	while not done.is_set():
+		positions = tracker.get_positions_df()
+		assert positions["symbol"].notna().all() and positions["position"].notna().all()
+		assert all(len(row) == 11 for row in tracker.portfolio_items)
+		tracker.get_portfolio_df()
+	writer.join()
+	assert len(tracker.get_positions_df()) == 3001
@@ -22,3 +22,18 @@ def test_calculate_position_size_invalid_without_stop_loss():
 
 	assert result["valid"] is False
 	assert result["quantity"] == 0
+
+
+def test_calculate_position_sizes_matches_scalar_sizing():
+	manager = RiskManager(max_risk_per_trade=0.02, max_position_ratio=0.5)
+	account = {"NetLiquidation": 100_000, "AvailableFunds": 30_000, "BuyingPower": 100_000}
+	entries = [100.0, 50.0, 20.0, None, 80.0]
+	stops = [95.0, 52.0, 20.0, 10.0, 0.5]
+
+	batch = manager.calculate_position_sizes(account, entries, stops)
+
+	for index, (entry, stop) in enumerate(zip(entries, stops)):
+		single = manager.calculate_position_size(account, {"entry_price": entry, "stop_loss": stop})
+		assert batch["valid"][index] == single["valid"]
+		assert batch["quantity"][index] == single["quantity"]
+		assert batch["position_value"][index] == single["position_value"]
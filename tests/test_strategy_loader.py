@@ -0,0 +1,15 @@
+from quant_trading.core.strategy_loader import _parse_env_file
+
+
+def test_parse_env_file_reads_assignments_and_tracks_edits(tmp_path):
+	env_file = tmp_path / "strategy.env"
+	env_file.write_text(
+		"ACTIVE_STRATEGY=MACD\n# comment\n  MACD_FAST = 12  \nMACD_NOTE=a=b # kept\nnot an assignment\r\n",
+		encoding="utf-8",
+	)
+
+	assert _parse_env_file(env_file) == {"ACTIVE_STRATEGY": "MACD", "MACD_FAST": "12", "MACD_NOTE": "a=b # kept"}
+
+	env_file.write_text("ACTIVE_STRATEGY=RSI\n", encoding="utf-8")
+	assert _parse_env_file(env_file) == {"ACTIVE_STRATEGY": "RSI"}
+	assert _parse_env_file(tmp_path / "missing.env") == {}
@@ -281,8 +281,7 @@ def _market_value_by_currency(tracker: PortfolioTracker) -> List[Dict[str, Any]]
     frame = tracker.get_portfolio_df()
     if frame.empty:
         return []
-    summary = frame.groupby("currency")["marketValue"].sum().reset_index()
-    result: List[Dict[str, Any]] = []
-    for row in summary.itertuples(index=False):
-        result.append({"currency": getattr(row, "currency"), "marketValue": float(getattr(row, "marketValue", 0.0))})
-    return result
+    return [
+        {"currency": currency, "marketValue": value}
+        for currency, value in PortfolioTracker.market_value_by_currency(frame)
+    ]